@@ -5,27 +5,45 @@ FastAPI + APScheduler + RL Trading Loop + Alpaca Integration
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 from datetime import datetime, timedelta
+import asyncio
 import os
-import json
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
+import aiofiles
+import numpy as np
+import orjson
 import pytz
 
 # Import custom modules (to be created)
 from backend.utils.data_fetch import fetch_market_data, get_historical_data
-from backend.utils.indicators import calculate_indicators
-from backend.utils.trader import AlpacaTrader, prepare_observation
+from backend.utils.streaming_indicators import (
+    IndicatorState,
+    load_state,
+    save_state,
+    update_from_frame,
+)
+from backend.utils.trader import (
+    AlpacaTrader,
+    fast_scaler_params,
+    load_scaler_params,
+    prepare_observation,
+)
 from backend.utils.logger import TradeLogger, PerformanceTracker
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize FastAPI
-app = FastAPI(title="AI Portfolio Manager API", version="1.0.0")
+# Initialize FastAPI (orjson serializes every dict response)
+app = FastAPI(
+    title="AI Portfolio Manager API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -45,6 +63,11 @@ MODEL_GROUPS = {
 }
 ALL_TICKERS = ["AAPL", "MSFT", "NVDA", "GOOGL", "TSLA", "XOM", "CVX", "JPM", "BAC"]
 
+# Decode table for the env's Discrete(3) action space: BUY goes fully long,
+# SELL exits the whole position, HOLD trades nothing
+ACTION_NAMES = ("HOLD", "BUY", "SELL")
+ACTION_SIZES = (0.0, 1.0, 1.0)
+
 # Initialize components
 trader = AlpacaTrader()
 trade_logger = TradeLogger()
@@ -52,45 +75,77 @@ performance_tracker = PerformanceTracker()
 scheduler = BackgroundScheduler(timezone=pytz.timezone('America/New_York'))
 
 
+def load_policy_only(path: str):
+    """
+    Load just the policy network from an SB3 model zip
+
+    PPO.load rebuilds the full training object (optimizer state, rollout
+    buffer wiring); for serving we only need the actor-critic policy, which
+    keeps resident memory down and speeds up cold start. The returned
+    policy exposes the same .predict(obs, deterministic=...) API the
+    strategy loop already uses.
+    """
+    from stable_baselines3.common.policies import ActorCriticPolicy
+    from stable_baselines3.common.save_util import load_from_zip_file
+
+    data, params, _ = load_from_zip_file(path, device='cpu')
+
+    policy = ActorCriticPolicy(
+        observation_space=data['observation_space'],
+        action_space=data['action_space'],
+        lr_schedule=lambda _: 0.0,
+        **(data.get('policy_kwargs') or {}),
+    )
+    policy.load_state_dict(params['policy'])
+    policy.set_training_mode(False)
+    return policy
+
+
 def load_models():
     """Load RL models from disk or Hugging Face"""
     try:
-        from stable_baselines3 import PPO
         import joblib
-        
-        # Load tech model
-        if os.path.exists("models/tech_model.zip"):
-            MODELS["tech"] = PPO.load("models/tech_model.zip")
-            logger.info("✅ Loaded tech_model.zip")
-
-        # Load energy model
-        if os.path.exists("models/energy_model.zip"):
-            MODELS["energy"] = PPO.load("models/energy_model.zip")
-            logger.info("✅ Loaded energy_model.zip")
-
-        # Load finance model (optional custom model)
-        if os.path.exists("models/finance_model.zip"):
-            MODELS["finance"] = PPO.load("models/finance_model.zip")
-            logger.info("✅ Loaded finance_model.zip")
-
-        # Load scalers (model-specific overrides fall back to the shared scaler)
-        if os.path.exists("models/tech_scaler.pkl"):
-            SCALERS["tech"] = joblib.load("models/tech_scaler.pkl")
-            logger.info("✅ Loaded tech_scaler.pkl")
-
-        if os.path.exists("models/energy_scaler.pkl"):
-            SCALERS["energy"] = joblib.load("models/energy_scaler.pkl")
-            logger.info("✅ Loaded energy_scaler.pkl")
-
-        if os.path.exists("models/finance_scaler.pkl"):
-            SCALERS["finance"] = joblib.load("models/finance_scaler.pkl")
-            logger.info("✅ Loaded finance_scaler.pkl")
-
-        if os.path.exists("models/scaler.pkl"):
-            shared_scaler = joblib.load("models/scaler.pkl")
+        import torch
+
+        # The policies are tiny MLPs; a single intra-op thread avoids the
+        # model groups contending for cores during back-to-back forwards
+        torch.set_num_threads(1)
+
+        # Load the policy networks only (no optimizer or rollout state)
+        for name in ("tech", "energy", "finance"):
+            model_path = f"models/{name}_model.zip"
+            if os.path.exists(model_path):
+                MODELS[name] = load_policy_only(model_path)
+                logger.info(f"✅ Loaded {name}_model.zip")
+
+        # Load scalers (model-specific overrides fall back to the shared
+        # scaler). Prefer the plain (mean, scale) .npz parameters written by
+        # training; legacy joblib .pkl files are reduced to the same
+        # (mean, 1/scale) vectors at load so every observation takes the
+        # in-place numpy path instead of sklearn's validated transform.
+        for name in ("tech", "energy", "finance"):
+            if os.path.exists(f"models/{name}_scaler.npz"):
+                params = load_scaler_params(f"models/{name}_scaler.npz")
+                if params is not None:
+                    SCALERS[name] = params
+                    logger.info(f"✅ Loaded {name}_scaler.npz")
+            elif os.path.exists(f"models/{name}_scaler.pkl"):
+                params = fast_scaler_params(joblib.load(f"models/{name}_scaler.pkl"))
+                if params is not None:
+                    SCALERS[name] = params
+                    logger.info(f"✅ Loaded {name}_scaler.pkl")
+
+        shared_scaler = None
+        if os.path.exists("models/scaler.npz"):
+            shared_scaler = load_scaler_params("models/scaler.npz")
+            logger.info("✅ Loaded shared scaler.npz")
+        elif os.path.exists("models/scaler.pkl"):
+            shared_scaler = fast_scaler_params(joblib.load("models/scaler.pkl"))
+            logger.info("✅ Loaded shared scaler.pkl")
+
+        if shared_scaler is not None:
             SCALERS.setdefault("tech", shared_scaler)
             SCALERS.setdefault("energy", shared_scaler)
-            logger.info("✅ Loaded shared scaler.pkl")
         
         return True
     except Exception as e:
@@ -118,7 +173,18 @@ def run_daily_strategy():
             logger.error("❌ Failed to fetch market data")
             return
         
-        # 2. Process each model group
+        # 2. Advance the streaming indicator state for every ticker.  The
+        # first run warms each state up over the full history; afterwards
+        # only the new bar(s) since the saved state are processed.
+        indicator_data = {}
+        for ticker, ticker_df in market_data.items():
+            state = load_state(ticker) or IndicatorState()
+            observation = update_from_frame(state, ticker_df)
+            if observation:
+                indicator_data[ticker] = observation
+                save_state(ticker, state)
+
+        # 3. Process each model group
         daily_signals = []
         
         for model_name, tickers in MODEL_GROUPS.items():
@@ -130,7 +196,11 @@ def run_daily_strategy():
             scaler = SCALERS.get(model_name)
             
             logger.info(f"🧠 Running {model_name} model predictions...")
-            
+
+            # Build one observation per ticker so the whole group runs
+            # through a single batched forward pass instead of N predicts
+            batch_tickers = []
+            batch_obs = []
             for ticker in tickers:
                 try:
                     # Get ticker data
@@ -138,22 +208,45 @@ def run_daily_strategy():
                     if ticker_data is None or len(ticker_data) < 30:
                         logger.warning(f"⚠️ Insufficient data for {ticker}")
                         continue
-                    
-                    # Calculate technical indicators
-                    obs_data = calculate_indicators(ticker_data)
-                    
+
+                    # Look up the precomputed indicators
+                    obs_data = indicator_data.get(ticker)
+                    if not obs_data:
+                        logger.warning(f"⚠️ No indicator data for {ticker}")
+                        continue
+
                     # Prepare observation for model
-                    obs = prepare_observation(obs_data, scaler)
-                    
-                    # Get model prediction
-                    action, _ = model.predict(obs, deterministic=True)
-                    
-                    # Decode action
-                    # action[0] = 0: HOLD, 1: BUY, 2: SELL
-                    # action[1] = position size (0-1)
-                    action_type = ["HOLD", "BUY", "SELL"][int(action[0])]
-                    position_size = float(action[1])
-                    
+                    batch_obs.append(prepare_observation(obs_data, scaler))
+                    batch_tickers.append(ticker)
+
+                except Exception as e:
+                    logger.error(f"❌ Error preparing observation for {ticker}: {e}")
+                    continue
+
+            if not batch_tickers:
+                continue
+
+            # Get model predictions for the whole group at once.  The model
+            # groups share one inference_mode context; torch skips autograd
+            # bookkeeping for every forward pass
+            import torch
+
+            obs_batch = np.vstack(batch_obs)
+            with torch.inference_mode():
+                actions, _ = model.predict(obs_batch, deterministic=True)
+
+            # Warm the trader's price cache once for the whole group so the
+            # per-ticker execute_trade calls below skip their own lookups
+            trader.prefetch_prices(batch_tickers)
+
+            for ticker, action in zip(batch_tickers, actions):
+                try:
+                    # Decode action: the policy emits a single Discrete(3)
+                    # index, which keys the precomputed action table
+                    act_idx = int(np.atleast_1d(action)[0])
+                    action_type = ACTION_NAMES[act_idx]
+                    position_size = ACTION_SIZES[act_idx]
+
                     signal = {
                         "timestamp": datetime.now().isoformat(),
                         "ticker": ticker,
@@ -166,7 +259,7 @@ def run_daily_strategy():
                     daily_signals.append(signal)
                     logger.info(f"📈 {ticker}: {action_type} (size: {position_size:.2f})")
                     
-                    # 3. Execute trade
+                    # 4. Execute trade
                     if action_type != "HOLD":
                         trade_result = trader.execute_trade(
                             ticker, 
@@ -182,11 +275,11 @@ def run_daily_strategy():
                     logger.error(f"❌ Error processing {ticker}: {e}")
                     continue
         
-        # 4. Update performance metrics
+        # 5. Update performance metrics
         portfolio_value = trader.get_portfolio_value()
         performance_tracker.update(portfolio_value, daily_signals)
         
-        # 5. Generate and send daily report
+        # 6. Generate and send daily report
         report = generate_daily_report(daily_signals)
         send_daily_notification(report)
         
@@ -203,8 +296,9 @@ def generate_daily_report(signals: List[Dict]) -> Dict:
     trades = trade_logger.get_today_trades()
     performance = performance_tracker.get_metrics()
     
+    now = datetime.now()
     report = {
-        "date": datetime.now().strftime("%Y-%m-%d"),
+        "date": now.strftime("%Y-%m-%d"),
         "portfolio": portfolio,
         "signals_generated": len(signals),
         "trades_executed": len(trades),
@@ -212,12 +306,12 @@ def generate_daily_report(signals: List[Dict]) -> Dict:
         "trades": trades,
         "performance": performance
     }
-    
-    # Save to file
-    os.makedirs("data", exist_ok=True)
-    with open(f"data/daily_report_{datetime.now().strftime('%Y%m%d')}.json", "w") as f:
-        json.dump(report, f, indent=2)
-    
+
+    # Save to file (the data directory is created once at startup)
+    report_file = f"data/daily_report_{now.strftime('%Y%m%d')}.json"
+    with open(report_file, "wb") as f:
+        f.write(orjson.dumps(report, option=orjson.OPT_INDENT_2))
+
     return report
 
 
@@ -255,7 +349,10 @@ def send_daily_notification(report: Dict):
 async def startup_event():
     """Initialize system on startup"""
     logger.info("🚀 Starting AI Portfolio Manager...")
-    
+
+    # Create the data directory once instead of on every report write
+    os.makedirs("data", exist_ok=True)
+
     # Load models
     if not load_models():
         logger.warning("⚠️ Models not loaded - running in demo mode")
@@ -329,24 +426,51 @@ async def get_trades(limit: int = 50):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Parsed daily reports keyed by file path; the mtime invalidates the entry
+# whenever run_daily_strategy rewrites the report.
+_REPORT_CACHE: Dict[str, Tuple[float, Dict]] = {}
+
+
+async def load_daily_report(date_str: str) -> Optional[Dict]:
+    """Read (and cache) the daily report for ``date_str`` without blocking.
+
+    The read goes through aiofiles so concurrent requests do not stall the
+    event loop, and repeat calls for an unchanged file are served from the
+    in-memory cache.
+    """
+    report_file = f"data/daily_report_{date_str}.json"
+
+    if not os.path.exists(report_file):
+        return None
+
+    mtime = os.path.getmtime(report_file)
+    cached = _REPORT_CACHE.get(report_file)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    async with aiofiles.open(report_file, 'rb') as f:
+        report = orjson.loads(await f.read())
+
+    _REPORT_CACHE[report_file] = (mtime, report)
+    return report
+
+
 @app.get("/api/signals")
 async def get_signals(model: Optional[str] = None):
     """Get latest AI signals"""
     try:
         # Load latest signals from file
         today = datetime.now().strftime("%Y%m%d")
-        signal_file = f"data/daily_report_{today}.json"
-        
-        if os.path.exists(signal_file):
-            with open(signal_file, 'r') as f:
-                report = json.load(f)
-                signals = report.get('signals', [])
-                
-                if model:
-                    signals = [s for s in signals if s['model'] == model]
-                
-                return {"signals": signals}
-        
+        report = await load_daily_report(today)
+
+        if report is not None:
+            signals = report.get('signals', [])
+
+            if model:
+                signals = [s for s in signals if s['model'] == model]
+
+            return {"signals": signals}
+
         return {"signals": []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -386,7 +510,8 @@ async def manual_trade(ticker: str, action: str, quantity: int):
 async def trigger_strategy():
     """Manually trigger strategy execution"""
     try:
-        run_daily_strategy()
+        # Run in a worker thread so the event loop stays responsive
+        await asyncio.to_thread(run_daily_strategy)
         return {"success": True, "message": "Strategy executed successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -404,4 +529,6 @@ async def get_models():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # "auto" picks uvloop/httptools whenever installed; uvloop is excluded
+    # on Windows in requirements.txt, so don't hard-require it here
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto", http="auto")
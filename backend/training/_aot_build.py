@@ -0,0 +1,34 @@
+"""Ahead-of-time build for the numba training kernels.
+
+Running ``python -m backend.training._aot_build`` compiles the jitted
+kernels into a ``_kernels`` extension module next to this file.  When that
+module is importable, ``_env_kernels`` and ``data_preparation`` pick up the
+precompiled functions at import time, so a fresh process skips the
+several-second JIT warm-up on the first training step / daily run.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+from numba.pycc import CC
+
+from ._env_kernels import _step_kernel
+from .data_preparation import _ewma_py
+
+cc = CC("_kernels")
+cc.output_dir = str(Path(__file__).resolve().parent)
+
+cc.export(
+    "step_kernel",
+    "Tuple((f8, f8, f8, f8, f8))(f4[:], i8, f8, f8, i8, f8)",
+)(_step_kernel)
+cc.export("ewma", "f8[:](f8[:], i8)")(_ewma_py)
+
+
+def main() -> None:
+    cc.compile()
+
+
+if __name__ == "__main__":  # pragma: no cover - build entry point
+    main()
@@ -0,0 +1,78 @@
+"""Numba-compiled kernels for the trading environment hot loop.
+
+Numba is optional: when it is unavailable the kernels run as plain Python
+functions with identical semantics, so training still works (just slower).
+When the ahead-of-time build has been run (``python -m
+backend.training._aot_build``) the precompiled ``_kernels`` extension is
+preferred, skipping the JIT warm-up on process start.
+"""
+
+from __future__ import annotations
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency fallback
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+
+        def decorator(func):
+            return func
+
+        return decorator
+
+
+try:  # pragma: no cover - only present after the AOT build
+    from ._kernels import step_kernel
+
+    _HAS_AOT_KERNELS = True
+except ImportError:
+    _HAS_AOT_KERNELS = False
+
+
+def _step_kernel(prices, step, position, cash, action, max_position):
+    """Advance the environment by one step and return the updated state.
+
+    Args:
+        prices: Contiguous ``float32`` array of close prices.
+        step: Current index into ``prices``.
+        position: Current position fraction.
+        cash: Current normalised portfolio value.
+        action: Discrete action (0 = hold, 1 = long, 2 = flat).
+        max_position: Position fraction taken when going long.
+
+    Returns:
+        Tuple of ``(reward, new_position, new_cash, price, next_price)``.
+    """
+
+    price = prices[step]
+
+    if action == 1:  # long
+        position = max_position
+    elif action == 2:  # exit to cash
+        position = 0.0
+    # action == 0 keeps existing position
+
+    next_price = prices[step + 1]
+    if price != 0.0:
+        price_change = (next_price - price) / price
+    else:
+        price_change = 0.0
+
+    reward = position * price_change
+
+    cash = cash + reward
+    if cash < 0.0:
+        cash = 0.0
+    elif cash > 10.0:
+        cash = 10.0
+
+    return reward, position, cash, price, next_price
+
+
+if not _HAS_AOT_KERNELS:
+    step_kernel = njit(cache=True)(_step_kernel)
+
+
+__all__ = ["step_kernel"]
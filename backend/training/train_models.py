@@ -4,13 +4,14 @@ from __future__ import annotations
 
 import argparse
 import logging
+import sys
 from pathlib import Path
 from typing import Any, Dict, Iterable, Optional
 
-import joblib
+import numpy as np
 from stable_baselines3 import PPO
 from stable_baselines3.common.callbacks import BaseCallback
-from stable_baselines3.common.vec_env import DummyVecEnv
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv, VecEnv
 
 from .config_loader import load_training_config
 from .data_preparation import TickerDataset, build_datasets
@@ -39,18 +40,25 @@ class TrainingProgressCallback(BaseCallback):
         else:
             self.update_interval = max(update_interval, 1)
         self._last_printed: int = 0
+        # Pre-built bar segments: _print_progress slices these instead of
+        # repeating string-multiply on every refresh
+        self._bar_filled = "█" * self.bar_width
+        self._bar_blank = "-" * self.bar_width
 
     def _on_training_start(self) -> None:
         print(f"\n🚀 Starting training for '{self.model_name}'")
         self._print_progress(0)
 
     def _on_step(self) -> bool:
+        # Fires on every env step: bail out with integer math alone before
+        # any formatting work happens
         if (
-            self.num_timesteps - self._last_printed >= self.update_interval
-            or self.num_timesteps >= self.total_timesteps
+            self.num_timesteps - self._last_printed < self.update_interval
+            and self.num_timesteps < self.total_timesteps
         ):
-            self._last_printed = self.num_timesteps
-            self._print_progress(self.num_timesteps)
+            return True
+        self._last_printed = self.num_timesteps
+        self._print_progress(self.num_timesteps)
         return True
 
     def _on_training_end(self) -> None:
@@ -62,14 +70,13 @@ class TrainingProgressCallback(BaseCallback):
         progress = min(current_timesteps, self.total_timesteps)
         fraction = progress / self.total_timesteps
         filled = int(self.bar_width * fraction)
-        bar = "█" * filled + "-" * (self.bar_width - filled)
+        bar = self._bar_filled[:filled] + self._bar_blank[filled:]
         percent = fraction * 100
         end = "\n" if final else "\r"
-        print(
-            f"[{bar}] {percent:6.2f}% ({progress}/{self.total_timesteps} steps)",
-            end=end,
-            flush=True,
+        sys.stderr.write(
+            f"[{bar}] {percent:6.2f}% ({progress}/{self.total_timesteps} steps){end}"
         )
+        sys.stderr.flush()
 
 
 def configure_logging(verbose: bool = False) -> None:
@@ -80,11 +87,53 @@ def configure_logging(verbose: bool = False) -> None:
     )
 
 
-def create_envs(datasets: Iterable[TickerDataset]) -> DummyVecEnv:
+def compile_policy(model: PPO) -> None:
+    """Compile the policy sub-networks with ``torch.compile``.
+
+    The observation shape is fixed at construction time, so Inductor can
+    specialise the small MLP forward passes with ``dynamic=False`` and no
+    shape guards.  Requires torch >= 2.1; older versions are left untouched.
+    """
+
+    import torch
+
+    version = tuple(int(part) for part in torch.__version__.split(".")[:2])
+    if version < (2, 1):
+        LOGGER.warning(
+            "torch %s does not support torch.compile well enough; skipping",
+            torch.__version__,
+        )
+        return
+
+    policy = model.policy
+    policy.mlp_extractor = torch.compile(
+        policy.mlp_extractor, mode="reduce-overhead", dynamic=False
+    )
+    policy.action_net = torch.compile(
+        policy.action_net, mode="reduce-overhead", dynamic=False
+    )
+    policy.value_net = torch.compile(
+        policy.value_net, mode="reduce-overhead", dynamic=False
+    )
+
+
+def create_envs(datasets: Iterable[TickerDataset], num_envs: int = 1) -> VecEnv:
+    """Wrap the datasets in a vectorised environment.
+
+    Each ticker dataset is replicated ``num_envs`` times so PPO can collect
+    rollouts from several copies in parallel.  With more than one environment
+    the copies are stepped in worker processes via ``SubprocVecEnv``, which
+    parallelises the CPU-bound rollout collection; a single environment keeps
+    the cheaper in-process ``DummyVecEnv``.
+    """
+
+    replicated = list(datasets) * max(int(num_envs), 1)
     env_fns = [
         (lambda data: (lambda: SingleStockTradingEnv(data)))(dataset)
-        for dataset in datasets
+        for dataset in replicated
     ]
+    if len(env_fns) > 1:
+        return SubprocVecEnv(env_fns, start_method="forkserver")
     return DummyVecEnv(env_fns)
 
 
@@ -102,9 +151,10 @@ def train_single_model(
         defaults.get("local_data_dir", "data/historical"),
     )
     total_timesteps = int(model_cfg.get("total_timesteps", defaults.get("total_timesteps", 200_000)))
+    num_envs = int(model_cfg.get("num_envs", defaults.get("num_envs", 1)))
     output_dir = Path(model_cfg.get("output_dir", defaults.get("output_dir", "backend/models")))
     model_filename = model_cfg.get("model_filename", f"{model_name}_model.zip")
-    scaler_filename = model_cfg.get("scaler_filename", f"{model_name}_scaler.pkl")
+    scaler_filename = model_cfg.get("scaler_filename", f"{model_name}_scaler.npz")
 
     ppo_params: Dict[str, Any] = dict(defaults.get("ppo_params", {}))
     ppo_params.update(model_cfg.get("ppo_params", {}))
@@ -117,9 +167,10 @@ def train_single_model(
         min_history=min_history,
         source=data_source,
         local_data_dir=local_data_dir,
+        force_refresh=bool(defaults.get("force_refresh", False)),
     )
 
-    vec_env = create_envs(datasets)
+    vec_env = create_envs(datasets, num_envs=num_envs)
 
     LOGGER.info("Training PPO agent for '%s' with %s timesteps", model_name, total_timesteps)
 
@@ -129,6 +180,8 @@ def train_single_model(
         verbose=1 if LOGGER.level <= logging.DEBUG else 0,
         **ppo_params,
     )
+    if model_cfg.get("compile", defaults.get("compile", False)):
+        compile_policy(model)
     progress_callback = TrainingProgressCallback(
         total_timesteps=total_timesteps,
         model_name=model_name,
@@ -137,13 +190,20 @@ def train_single_model(
 
     output_dir.mkdir(parents=True, exist_ok=True)
     model_path = output_dir / model_filename
-    scaler_path = output_dir / scaler_filename
+    scaler_path = (output_dir / scaler_filename).with_suffix(".npz")
 
     LOGGER.info("Saving model to %s", model_path)
     model.save(model_path)
 
-    LOGGER.info("Saving scaler to %s", scaler_path)
-    joblib.dump(scaler, scaler_path)
+    # The scaler transform is just (x - mean) / scale, so persist the two
+    # vectors rather than the whole sklearn object; inference then needs no
+    # sklearn (or pickle) on the hot path.
+    LOGGER.info("Saving scaler parameters to %s", scaler_path)
+    np.savez(
+        scaler_path,
+        mean=scaler.mean_.astype(np.float32),
+        scale=scaler.scale_.astype(np.float32),
+    )
 
 
 def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
@@ -154,6 +214,22 @@ def parse_args(argv: Iterable[str] | None = None) -> argparse.Namespace:
         default=None,
         help="Path to a YAML configuration file. Defaults to training_config.yaml.",
     )
+    parser.add_argument(
+        "--num-envs",
+        type=int,
+        default=None,
+        help="Replicate each ticker dataset N times for parallel rollout collection.",
+    )
+    parser.add_argument(
+        "--compile",
+        action="store_true",
+        help="Compile the policy networks with torch.compile (torch >= 2.1).",
+    )
+    parser.add_argument(
+        "--force-refresh",
+        action="store_true",
+        help="Ignore cached feature datasets and rebuild them from source data.",
+    )
     parser.add_argument(
         "--verbose",
         action="store_true",
@@ -168,6 +244,12 @@ def main(argv: Iterable[str] | None = None) -> None:
 
     config = load_training_config(args.config)
     defaults: Dict[str, Any] = config.get("defaults", {})
+    if args.num_envs is not None:
+        defaults["num_envs"] = args.num_envs
+    if args.force_refresh:
+        defaults["force_refresh"] = True
+    if args.compile:
+        defaults["compile"] = True
 
     for model_name, model_cfg in config["models"].items():
         try:
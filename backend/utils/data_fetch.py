@@ -10,10 +10,44 @@ from pathlib import Path
 from typing import Dict, Iterable, List, Optional
 
 import pandas as pd
+import pytz
+import requests
 import yfinance as yf
+from requests.adapters import HTTPAdapter
+from functools import lru_cache
+
+from joblib import Memory, Parallel, delayed
 
 logger = logging.getLogger(__name__)
 
+# Memoised once: pytz.timezone() parses the zoneinfo database on each call
+_ET_TZ = pytz.timezone('America/New_York')
+
+try:  # pyarrow is optional: faster CSV parsing and a Parquet shadow format
+    import pyarrow.csv as _pacsv
+
+    _HAS_PYARROW = True
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    _HAS_PYARROW = False
+
+# On-disk cache for parsed CSVs and downloaded histories.  Cached frames are
+# re-loaded memory-mapped, skipping both pandas CSV parsing and HTTP on
+# repeat calls (e.g. successive train_models.py runs).
+_MEMORY = Memory(location=".cache/data", mmap_mode="r", verbose=0)
+
+
+# One keep-alive session shared by all yfinance traffic: connections (and
+# their TLS handshakes) are reused across tickers instead of re-established
+# per request.
+_SESSION = requests.Session()
+_SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32))
+
+
+@lru_cache(maxsize=512)
+def _ticker(symbol: str) -> yf.Ticker:
+    """Reuse yf.Ticker objects (and the shared HTTP session) per symbol."""
+    return yf.Ticker(symbol, session=_SESSION)
+
 
 def fetch_market_data(tickers: List[str], days: int = 60) -> Dict[str, pd.DataFrame]:
     """
@@ -28,65 +62,94 @@ def fetch_market_data(tickers: List[str], days: int = 60) -> Dict[str, pd.DataFr
     """
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
-    
+
     market_data = {}
-    
+
+    try:
+        logger.info(f"📊 Fetching data for {len(tickers)} tickers in one batch...")
+
+        # One batched download instead of N serial round-trips; yfinance
+        # fans the request out over its own thread pool
+        batch = yf.download(
+            list(tickers),
+            start=start_date,
+            end=end_date,
+            group_by='ticker',
+            threads=True,
+            progress=False,
+            session=_SESSION
+        )
+    except Exception as e:
+        logger.error(f"❌ Error fetching batch market data: {e}")
+        return market_data
+
+    if batch is None or batch.empty:
+        logger.warning("⚠️ No data returned for any ticker")
+        return market_data
+
     for ticker in tickers:
         try:
-            logger.info(f"📊 Fetching data for {ticker}...")
-            
-            # Download data from Yahoo Finance
-            df = yf.download(
-                ticker,
-                start=start_date,
-                end=end_date,
-                progress=False
-            )
-            
+            # With group_by='ticker' the columns are a (ticker, field)
+            # MultiIndex; a single-ticker download stays flat
+            if isinstance(batch.columns, pd.MultiIndex):
+                if ticker not in batch.columns.get_level_values(0):
+                    logger.warning(f"⚠️ No data returned for {ticker}")
+                    continue
+                df = batch[ticker].dropna(how='all')
+            else:
+                df = batch.dropna(how='all')
+
             if df.empty:
                 logger.warning(f"⚠️ No data returned for {ticker}")
                 continue
-            
-            # Clean column names
-            df.columns = [col.lower() for col in df.columns]
-            
-            # Reset index to make date a column
+
+            # Reset index to make date a column, then clean column names
             df = df.reset_index()
-            
+            df.columns = [str(col).lower() for col in df.columns]
+
             market_data[ticker] = df
             logger.info(f"✅ Fetched {len(df)} rows for {ticker}")
-            
+
         except Exception as e:
-            logger.error(f"❌ Error fetching data for {ticker}: {e}")
+            logger.error(f"❌ Error extracting data for {ticker}: {e}")
             continue
-    
+
     return market_data
 
 
-def _normalise_ohlcv_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Return a copy of *df* with normalised column naming conventions."""
+_COLUMN_ALIAS_MAP = {
+    "adjclose": "adj_close",
+    "adj_close": "adj_close",
+    "adjusted_close": "adj_close",
+    "close_last": "close",
+    "close_price": "close",
+    "closing_price": "close",
+    "close_value": "close",
+}
+
 
-    normalised = df.copy()
+def _clean_column_name(name: str) -> str:
+    """Return a snake_case version of *name* with known aliases mapped."""
 
-    def _clean_column_name(name: str) -> str:
-        """Return a snake_case version of *name* with known aliases mapped."""
+    cleaned = re.sub(r"[^0-9a-zA-Z]+", "_", str(name).strip().lower())
+    cleaned = re.sub(r"_+", "_", cleaned).strip("_")
 
-        cleaned = re.sub(r"[^0-9a-zA-Z]+", "_", name.strip().lower())
-        cleaned = re.sub(r"_+", "_", cleaned).strip("_")
+    return _COLUMN_ALIAS_MAP.get(cleaned, cleaned)
 
-        alias_map = {
-            "adjclose": "adj_close",
-            "adj_close": "adj_close",
-            "adjusted_close": "adj_close",
-            "close_last": "close",
-            "close_price": "close",
-            "closing_price": "close",
-            "close_value": "close",
-        }
 
-        return alias_map.get(cleaned, cleaned)
+def _normalise_ohlcv_columns(df: pd.DataFrame, *, copy: bool = False) -> pd.DataFrame:
+    """Return *df* with normalised column naming conventions.
+
+    Renames are metadata-only (no buffer duplication); column coercions below
+    replace individual columns without touching the caller's frame.  Pass
+    ``copy=True`` for an eager defensive copy.
+    """
 
-    normalised.columns = [_clean_column_name(col) for col in normalised.columns]
+    if copy:
+        df = df.copy()
+
+    # rename(copy=False) swaps the column index without copying block data
+    normalised = df.rename(columns=_clean_column_name, copy=False)
 
     # Ensure OHLCV columns are numeric even if stored as formatted strings.
     numeric_columns = {
@@ -111,7 +174,7 @@ def _normalise_ohlcv_columns(df: pd.DataFrame) -> pd.DataFrame:
     if "date" not in normalised.columns:
         for candidate in ("datetime", "index", "timestamp"):
             if candidate in normalised.columns:
-                normalised = normalised.rename(columns={candidate: "date"})
+                normalised = normalised.rename(columns={candidate: "date"}, copy=False)
                 break
 
     if "close" not in normalised.columns:
@@ -123,6 +186,33 @@ def _normalise_ohlcv_columns(df: pd.DataFrame) -> pd.DataFrame:
     return normalised
 
 
+@_MEMORY.cache
+def _read_historical_csv(path: str, mtime: float) -> pd.DataFrame:
+    """Parse and normalise one historical CSV.
+
+    ``mtime`` is part of the cache key so a rewritten file busts the cache.
+    Parsing goes through pyarrow's multithreaded C++ reader when available,
+    falling back to pandas otherwise.
+    """
+
+    df = None
+    if _HAS_PYARROW:
+        try:
+            df = _pacsv.read_csv(path).to_pandas()
+        except Exception:  # malformed for arrow; let pandas try
+            df = None
+    if df is None:
+        df = pd.read_csv(path)
+    return _normalise_ohlcv_columns(df)
+
+
+@_MEMORY.cache
+def _read_historical_parquet(path: str, mtime: float) -> pd.DataFrame:
+    """Parse and normalise one historical Parquet file (see _read_historical_csv)."""
+
+    return _normalise_ohlcv_columns(pd.read_parquet(path))
+
+
 def load_local_historical_data(
     ticker: str,
     *,
@@ -155,11 +245,20 @@ def load_local_historical_data(
     )
 
     for candidate in possible_filenames:
+        # Prefer a Parquet shadow of the CSV when one has been written
+        parquet = candidate.with_suffix(".parquet")
+        if _HAS_PYARROW and parquet.exists():
+            try:
+                df = _read_historical_parquet(str(parquet), parquet.stat().st_mtime)
+                logger.info("✅ Loaded %s data from %s", ticker, parquet)
+                return df
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.error("❌ Error reading %s: %s", parquet, exc)
         if candidate.exists():
             try:
-                df = pd.read_csv(candidate)
+                df = _read_historical_csv(str(candidate), candidate.stat().st_mtime)
                 logger.info("✅ Loaded %s data from %s", ticker, candidate)
-                return _normalise_ohlcv_columns(df)
+                return df
             except Exception as exc:  # pragma: no cover - defensive
                 logger.error("❌ Error reading %s: %s", candidate, exc)
                 return None
@@ -171,16 +270,49 @@ def load_local_historical_data(
     matching_files.sort()
     if matching_files:
         latest_file = matching_files[-1]
+        parquet = latest_file.with_suffix(".parquet")
+        if _HAS_PYARROW and parquet.exists():
+            try:
+                df = _read_historical_parquet(str(parquet), parquet.stat().st_mtime)
+                logger.info("✅ Loaded %s data from %s", ticker, parquet)
+                return df
+            except Exception as exc:  # pragma: no cover - defensive
+                logger.error("❌ Error reading %s: %s", parquet, exc)
         try:
-            df = pd.read_csv(latest_file)
+            df = _read_historical_csv(str(latest_file), latest_file.stat().st_mtime)
             logger.info("✅ Loaded %s data from %s", ticker, latest_file)
-            return _normalise_ohlcv_columns(df)
+            return df
         except Exception as exc:  # pragma: no cover - defensive
             logger.error("❌ Error reading %s: %s", latest_file, exc)
 
     return None
 
 
+class _EmptyDownloadError(RuntimeError):
+    """Raised for an empty download so joblib never memoizes the failure.
+
+    yfinance returns an empty frame (rather than raising) on transient
+    network or rate-limit errors; caching that would blank the ticker for
+    the rest of the day.
+    """
+
+
+@_MEMORY.cache
+def _download_history(ticker: str, period: str, date_key: str) -> pd.DataFrame:
+    """Download and normalise *period* of history for *ticker*.
+
+    ``date_key`` (today's date) is part of the cache key so cached downloads
+    expire daily without manual invalidation.
+    """
+
+    df = _ticker(ticker).history(period=period)
+
+    if df.empty:
+        raise _EmptyDownloadError(ticker)
+
+    return _normalise_ohlcv_columns(df.reset_index())
+
+
 def get_historical_data(
     ticker: str,
     period: str = "1y",
@@ -216,15 +348,11 @@ def get_historical_data(
 
     if source_normalised in {"auto", "yfinance"}:
         try:
-            stock = yf.Ticker(ticker)
-            df = stock.history(period=period)
+            return _download_history(ticker, period, datetime.now().strftime("%Y-%m-%d"))
 
-            if df.empty:
-                logger.warning(f"⚠️ No historical data for {ticker}")
-                return None
-
-            df = df.reset_index()
-            return _normalise_ohlcv_columns(df)
+        except _EmptyDownloadError:
+            logger.warning(f"⚠️ No historical data for {ticker}")
+            return None
 
         except Exception as e:  # pragma: no cover - fallback protection
             logger.error(f"❌ Error getting historical data for {ticker}: {e}")
@@ -236,14 +364,13 @@ def get_historical_data(
 def get_latest_price(ticker: str) -> Optional[float]:
     """Get latest price for a ticker"""
     try:
-        stock = yf.Ticker(ticker)
-        data = stock.history(period="1d")
-        
+        data = _ticker(ticker).history(period="1d")
+
         if not data.empty:
             return float(data['Close'].iloc[-1])
-        
+
         return None
-        
+
     except Exception as e:
         logger.error(f"❌ Error getting latest price for {ticker}: {e}")
         return None
@@ -252,33 +379,56 @@ def get_latest_price(ticker: str) -> Optional[float]:
 def get_latest_bar(tickers: List[str]) -> Dict[str, Dict]:
     """
     Get latest OHLCV bar for multiple tickers
-    
+
+    All tickers are fetched with a single batched download, so the network
+    cost is one round-trip regardless of how many symbols are requested.
+
     Returns:
         Dictionary mapping ticker -> {open, high, low, close, volume}
     """
-    latest_bars = {}
-    
+    try:
+        batch = yf.download(
+            list(tickers),
+            period='1d',
+            group_by='ticker',
+            threads=True,
+            progress=False,
+            session=_SESSION
+        )
+    except Exception as e:
+        logger.error(f"❌ Error fetching latest bars: {e}")
+        return {}
+
+    if batch is None or batch.empty:
+        return {}
+
+    bars: Dict[str, Dict] = {}
     for ticker in tickers:
+        # Error isolation per symbol lives on the slicing, not the network call
         try:
-            stock = yf.Ticker(ticker)
-            data = stock.history(period="1d")
-            
-            if not data.empty:
-                latest = data.iloc[-1]
-                latest_bars[ticker] = {
-                    'open': float(latest['Open']),
-                    'high': float(latest['High']),
-                    'low': float(latest['Low']),
-                    'close': float(latest['Close']),
-                    'volume': float(latest['Volume']),
-                    'timestamp': data.index[-1].isoformat()
-                }
-        
+            if isinstance(batch.columns, pd.MultiIndex):
+                if ticker not in batch.columns.get_level_values(0):
+                    continue
+                data = batch[ticker].dropna(how='all')
+            else:
+                data = batch.dropna(how='all')
+
+            if data.empty:
+                continue
+
+            latest = data.iloc[-1]
+            bars[ticker] = {
+                'open': float(latest['Open']),
+                'high': float(latest['High']),
+                'low': float(latest['Low']),
+                'close': float(latest['Close']),
+                'volume': float(latest['Volume']),
+                'timestamp': data.index[-1].isoformat()
+            }
         except Exception as e:
             logger.error(f"❌ Error getting latest bar for {ticker}: {e}")
-            continue
-    
-    return latest_bars
+
+    return bars
 
 
 def get_intraday_data(ticker: str, interval: str = "5m") -> Optional[pd.DataFrame]:
@@ -293,8 +443,7 @@ def get_intraday_data(ticker: str, interval: str = "5m") -> Optional[pd.DataFram
         DataFrame with intraday OHLCV data
     """
     try:
-        stock = yf.Ticker(ticker)
-        df = stock.history(period="1d", interval=interval)
+        df = _ticker(ticker).history(period="1d", interval=interval)
         
         if df.empty:
             logger.warning(f"⚠️ No intraday data for {ticker}")
@@ -311,26 +460,46 @@ def get_intraday_data(ticker: str, interval: str = "5m") -> Optional[pd.DataFram
         return None
 
 
-def save_market_data(data: Dict[str, pd.DataFrame], directory: str = "data/historical"):
+def _write_one(ticker: str, df: pd.DataFrame, directory: str, stamp: str,
+               write_csv: bool) -> None:
+    """Write one ticker's frame (thread-pool worker)."""
+
+    try:
+        stem = f"{directory}/{ticker}_{stamp}"
+        if _HAS_PYARROW:
+            # Parquet shadow: loaders prefer it, skipping CSV re-parsing
+            df.to_parquet(f"{stem}.parquet", compression='zstd')
+        if write_csv or not _HAS_PYARROW:
+            df.to_csv(f"{stem}.csv", index=False)
+        logger.info(f"💾 Saved {ticker} data to {stem}")
+
+    except Exception as e:
+        logger.error(f"❌ Error saving data for {ticker}: {e}")
+
+
+def save_market_data(data: Dict[str, pd.DataFrame], directory: str = "data/historical",
+                     write_csv: bool = True):
     """
-    Save market data to CSV files
-    
+    Save market data files, one ticker per worker thread
+
+    Parquet (when pyarrow is installed) is written first — its writer
+    releases the GIL, so the per-ticker writes genuinely overlap.  Pass
+    ``write_csv=False`` to skip the slower CSV copies.
+
     Args:
         data: Dictionary of ticker -> DataFrame
         directory: Directory to save files
+        write_csv: Also write CSV files (always on without pyarrow)
     """
     import os
-    
+
     os.makedirs(directory, exist_ok=True)
-    
-    for ticker, df in data.items():
-        try:
-            filename = f"{directory}/{ticker}_{datetime.now().strftime('%Y%m%d')}.csv"
-            df.to_csv(filename, index=False)
-            logger.info(f"💾 Saved {ticker} data to {filename}")
-        
-        except Exception as e:
-            logger.error(f"❌ Error saving data for {ticker}: {e}")
+
+    stamp = datetime.now().strftime('%Y%m%d')
+    Parallel(n_jobs=-1, backend='threading')(
+        delayed(_write_one)(ticker, df, directory, stamp, write_csv)
+        for ticker, df in data.items()
+    )
 
 
 def load_market_data(ticker: str, date: Optional[str] = None, directory: str = "data/historical") -> Optional[pd.DataFrame]:
@@ -350,17 +519,26 @@ def load_market_data(ticker: str, date: Optional[str] = None, directory: str = "
     if date is None:
         date = datetime.now().strftime('%Y%m%d')
     
+    parquet_filename = f"{directory}/{ticker}_{date}.parquet"
     filename = f"{directory}/{ticker}_{date}.csv"
-    
+
+    if _HAS_PYARROW and os.path.exists(parquet_filename):
+        try:
+            df = pd.read_parquet(parquet_filename)
+            logger.info(f"✅ Loaded {ticker} data from {parquet_filename}")
+            return df
+        except Exception as e:
+            logger.error(f"❌ Error loading data for {ticker}: {e}")
+
     if not os.path.exists(filename):
         logger.warning(f"⚠️ File not found: {filename}")
         return None
-    
+
     try:
         df = pd.read_csv(filename)
         logger.info(f"✅ Loaded {ticker} data from {filename}")
         return df
-    
+
     except Exception as e:
         logger.error(f"❌ Error loading data for {ticker}: {e}")
         return None
@@ -373,12 +551,8 @@ def get_market_status() -> Dict:
     Returns:
         Dictionary with market status info
     """
-    from datetime import datetime
-    import pytz
-    
     # Get current time in ET
-    et_tz = pytz.timezone('America/New_York')
-    now = datetime.now(et_tz)
+    now = datetime.now(_ET_TZ)
     
     # Market hours: 9:30 AM - 4:00 PM ET, Mon-Fri
     is_weekday = now.weekday() < 5  # 0-4 = Mon-Fri
@@ -400,35 +574,33 @@ def get_market_status() -> Dict:
 
 def get_next_market_open(current_time: datetime) -> str:
     """Calculate next market open time"""
-    et_tz = pytz.timezone('America/New_York')
-    
     # Start with current day at 9:30 AM
     next_open = current_time.replace(hour=9, minute=30, second=0, microsecond=0)
-    
+
     # If already past market open today, move to next day
     if current_time >= next_open:
         next_open += timedelta(days=1)
-    
-    # Skip weekends
-    while next_open.weekday() >= 5:
-        next_open += timedelta(days=1)
-    
+
+    # Skip weekends in one jump (Sat -> +2, Sun -> +1)
+    weekday = next_open.weekday()
+    if weekday >= 5:
+        next_open += timedelta(days=7 - weekday)
+
     return next_open.strftime("%Y-%m-%d %H:%M:%S %Z")
 
 
 def get_next_market_close(current_time: datetime) -> str:
     """Calculate next market close time"""
-    et_tz = pytz.timezone('America/New_York')
-    
     # Start with current day at 4:00 PM
     next_close = current_time.replace(hour=16, minute=0, second=0, microsecond=0)
-    
+
     # If already past market close or it's weekend, move to next day
     if current_time >= next_close or current_time.weekday() >= 5:
         next_close += timedelta(days=1)
-    
-    # Skip weekends
-    while next_close.weekday() >= 5:
-        next_close += timedelta(days=1)
-    
+
+    # Skip weekends in one jump (Sat -> +2, Sun -> +1)
+    weekday = next_close.weekday()
+    if weekday >= 5:
+        next_close += timedelta(days=7 - weekday)
+
     return next_close.strftime("%Y-%m-%d %H:%M:%S %Z")
\ No newline at end of file
@@ -5,11 +5,19 @@ Computes SMA, EMA, RSI, MACD, Bollinger Bands, and other indicators
 
 import pandas as pd
 import numpy as np
+from scipy.signal import lfilter
 from typing import Dict, Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
+try:  # numba is an optional accelerator; fall back to pure Python without it
+    from numba import njit
+
+    _HAS_NUMBA = True
+except ImportError:  # pragma: no cover - exercised only without numba
+    _HAS_NUMBA = False
+
 
 def calculate_indicators(df: pd.DataFrame) -> Dict:
     """
@@ -22,55 +30,284 @@ def calculate_indicators(df: pd.DataFrame) -> Dict:
         Dictionary with latest indicator values
     """
     try:
-        # Make a copy to avoid modifying original
-        data = df.copy()
-        
         # Ensure we have required columns
         required_cols = ['close', 'open', 'high', 'low', 'volume']
         for col in required_cols:
-            if col not in data.columns:
+            if col not in df.columns:
                 logger.error(f"❌ Missing required column: {col}")
                 return {}
-        
-        # Calculate all indicators
-        data = add_sma(data, [20, 50])
-        data = add_ema(data, [12, 26])
-        data = add_rsi(data, 14)
-        data = add_macd(data)
-        data = add_bollinger_bands(data, 20, 2)
-        data = add_returns(data)
-        
-        # Get latest row
-        latest = data.iloc[-1]
-        
-        # Build observation dictionary
-        observation = {
+
+        # Only the last row feeds the observation, so instead of running the
+        # add_* pipeline (six passes, one full-length column each) stream the
+        # close array once through a fused kernel and keep just the final
+        # scalar per indicator.
+        close = df['close'].to_numpy(dtype=np.float64)
+        if close.size == 0:
+            # Guard before the kernel: numba compiles without bounds checks,
+            # so close[0] on an empty array would be an out-of-bounds read
+            # rather than a catchable IndexError
+            return {}
+        (
+            sma_20, sma_50, ema_12, ema_26, rsi,
+            macd, macd_signal, macd_hist,
+            bb_upper, bb_middle, bb_lower, returns,
+        ) = _latest_indicators_kernel(close)
+
+        latest = df.iloc[-1]
+
+        return {
             'close': float(latest['close']),
             'open': float(latest['open']),
             'high': float(latest['high']),
             'low': float(latest['low']),
             'volume': float(latest['volume']),
-            'sma_20': float(latest.get('sma_20', latest['close'])),
-            'sma_50': float(latest.get('sma_50', latest['close'])),
-            'ema_12': float(latest.get('ema_12', latest['close'])),
-            'ema_26': float(latest.get('ema_26', latest['close'])),
-            'rsi': float(latest.get('rsi', 50)),
-            'macd': float(latest.get('macd', 0)),
-            'macd_signal': float(latest.get('macd_signal', 0)),
-            'macd_hist': float(latest.get('macd_hist', 0)),
-            'bb_upper': float(latest.get('bb_upper', latest['close'])),
-            'bb_middle': float(latest.get('bb_middle', latest['close'])),
-            'bb_lower': float(latest.get('bb_lower', latest['close'])),
-            'returns': float(latest.get('returns', 0))
+            'sma_20': float(sma_20),
+            'sma_50': float(sma_50),
+            'ema_12': float(ema_12),
+            'ema_26': float(ema_26),
+            'rsi': float(rsi),
+            'macd': float(macd),
+            'macd_signal': float(macd_signal),
+            'macd_hist': float(macd_hist),
+            'bb_upper': float(bb_upper),
+            'bb_middle': float(bb_middle),
+            'bb_lower': float(bb_lower),
+            'returns': float(returns),
         }
-        
-        return observation
-        
+
     except Exception as e:
         logger.error(f"❌ Error calculating indicators: {e}")
         return {}
 
 
+def calculate_indicator_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Return a copy of *df* widened with full indicator columns
+
+    calculate_indicators only produces last-row scalars; use this when the
+    whole history of each indicator is needed (plots, backtests).
+    """
+    data = df.copy()
+    data = add_sma(data, [20, 50])
+    data = add_ema(data, [12, 26])
+    data = add_rsi(data, 14)
+    data = add_macd(data)
+    data = add_bollinger_bands(data, 20, 2)
+    data = add_returns(data)
+    return data
+
+
+def _latest_indicators_kernel(close: np.ndarray):
+    """Fused single pass computing only the final value of each indicator.
+
+    EMAs (and the MACD signal line) need the full recursion, so the array is
+    walked once; the window indicators (SMA, RSI, Bollinger) only need their
+    last window, so they reduce over a tail slice.  NaN/fill semantics match
+    the add_* pipeline: SMAs stay NaN below their window, RSI falls back to
+    50, Bollinger bands to the close, returns to 0.
+    """
+    n = close.size
+
+    alpha_12 = 2.0 / 13.0
+    alpha_26 = 2.0 / 27.0
+    alpha_9 = 2.0 / 10.0
+
+    ema_12 = close[0]
+    ema_26 = close[0]
+    macd_signal = 0.0  # macd at t=0 is ema_12 - ema_26 == 0
+    for i in range(1, n):
+        ema_12 = ema_12 + alpha_12 * (close[i] - ema_12)
+        ema_26 = ema_26 + alpha_26 * (close[i] - ema_26)
+        macd_signal = macd_signal + alpha_9 * ((ema_12 - ema_26) - macd_signal)
+
+    macd = ema_12 - ema_26
+    macd_hist = macd - macd_signal
+
+    last = close[n - 1]
+
+    sma_20 = np.nan
+    bb_upper = last
+    bb_middle = last
+    bb_lower = last
+    if n >= 20:
+        mean_20 = 0.0
+        for i in range(n - 20, n):
+            mean_20 += close[i]
+        mean_20 /= 20.0
+        var_20 = 0.0
+        for i in range(n - 20, n):
+            var_20 += (close[i] - mean_20) ** 2
+        std_20 = np.sqrt(var_20 / 19.0)  # ddof=1, as pandas rolling std
+        sma_20 = mean_20
+        bb_middle = mean_20
+        bb_upper = mean_20 + 2.0 * std_20
+        bb_lower = mean_20 - 2.0 * std_20
+
+    sma_50 = np.nan
+    if n >= 50:
+        mean_50 = 0.0
+        for i in range(n - 50, n):
+            mean_50 += close[i]
+        sma_50 = mean_50 / 50.0
+
+    rsi = 50.0
+    if n >= 14:
+        gain_sum = 0.0
+        loss_sum = 0.0
+        for i in range(n - 14, n):
+            if i == 0:
+                continue  # delta undefined at t=0; treated as 0 gain/loss
+            delta = close[i] - close[i - 1]
+            if delta > 0:
+                gain_sum += delta
+            elif delta < 0:
+                loss_sum -= delta
+        if loss_sum > 0:
+            rs = gain_sum / loss_sum
+            rsi = 100.0 - 100.0 / (1.0 + rs)
+        elif gain_sum > 0:
+            rsi = 100.0
+        # both zero -> flat window -> neutral 50
+
+    returns = 0.0
+    if n >= 2 and close[n - 2] != 0:
+        returns = last / close[n - 2] - 1.0
+
+    return (
+        sma_20, sma_50, ema_12, ema_26, rsi,
+        macd, macd_signal, macd_hist,
+        bb_upper, bb_middle, bb_lower, returns,
+    )
+
+
+if _HAS_NUMBA:
+    _latest_indicators_kernel = njit(cache=True)(_latest_indicators_kernel)
+
+
+def _observation_from_row(latest) -> Dict:
+    """Build the observation dictionary from the latest indicator row"""
+    return {
+        'close': float(latest['close']),
+        'open': float(latest['open']),
+        'high': float(latest['high']),
+        'low': float(latest['low']),
+        'volume': float(latest['volume']),
+        'sma_20': float(latest.get('sma_20', latest['close'])),
+        'sma_50': float(latest.get('sma_50', latest['close'])),
+        'ema_12': float(latest.get('ema_12', latest['close'])),
+        'ema_26': float(latest.get('ema_26', latest['close'])),
+        'rsi': float(latest.get('rsi', 50)),
+        'macd': float(latest.get('macd', 0)),
+        'macd_signal': float(latest.get('macd_signal', 0)),
+        'macd_hist': float(latest.get('macd_hist', 0)),
+        'bb_upper': float(latest.get('bb_upper', latest['close'])),
+        'bb_middle': float(latest.get('bb_middle', latest['close'])),
+        'bb_lower': float(latest.get('bb_lower', latest['close'])),
+        'returns': float(latest.get('returns', 0))
+    }
+
+
+def calculate_indicators_bulk(market_data: Dict) -> Dict[str, Dict]:
+    """
+    Calculate indicators for many tickers with one long-format DataFrame
+
+    Stacks all ticker frames into a single DataFrame and runs every rolling
+    window / EMA as a grouped transform, so pandas processes all tickers in
+    vectorized C instead of looping per symbol in Python.
+
+    Args:
+        market_data: Dictionary mapping ticker -> OHLCV DataFrame
+
+    Returns:
+        Dictionary mapping ticker -> observation dict (latest indicator values)
+    """
+    try:
+        required_cols = ['close', 'open', 'high', 'low', 'volume']
+        frames = []
+        for ticker, df in market_data.items():
+            if df is None or df.empty:
+                continue
+            if any(col not in df.columns for col in required_cols):
+                logger.error(f"❌ Missing required columns for {ticker}")
+                continue
+            frames.append(df.assign(ticker=ticker))
+
+        if not frames:
+            return {}
+
+        big_df = pd.concat(frames, ignore_index=True)
+        grouped_close = big_df.groupby('ticker', sort=False)['close']
+
+        big_df['sma_20'] = grouped_close.transform(lambda s: s.rolling(window=20).mean())
+        big_df['sma_50'] = grouped_close.transform(lambda s: s.rolling(window=50).mean())
+        big_df['ema_12'] = grouped_close.transform(lambda s: s.ewm(span=12, adjust=False).mean())
+        big_df['ema_26'] = grouped_close.transform(lambda s: s.ewm(span=26, adjust=False).mean())
+
+        # RSI: grouped rolling means of gains and losses
+        delta = grouped_close.transform('diff')
+        gain = delta.where(delta > 0, 0)
+        loss = -delta.where(delta < 0, 0)
+        avg_gain = gain.groupby(big_df['ticker'], sort=False).transform(lambda s: s.rolling(window=14).mean())
+        avg_loss = loss.groupby(big_df['ticker'], sort=False).transform(lambda s: s.rolling(window=14).mean())
+        rs = avg_gain / avg_loss
+        big_df['rsi'] = (100 - (100 / (1 + rs))).fillna(50)
+
+        # MACD from the grouped EMAs
+        big_df['macd'] = (big_df['ema_12'] - big_df['ema_26']).fillna(0)
+        big_df['macd_signal'] = (
+            big_df.groupby('ticker', sort=False)['macd']
+            .transform(lambda s: s.ewm(span=9, adjust=False).mean())
+            .fillna(0)
+        )
+        big_df['macd_hist'] = (big_df['macd'] - big_df['macd_signal']).fillna(0)
+
+        # Bollinger Bands
+        bb_middle = grouped_close.transform(lambda s: s.rolling(window=20).mean())
+        bb_std = grouped_close.transform(lambda s: s.rolling(window=20).std())
+        big_df['bb_upper'] = (bb_middle + 2 * bb_std).fillna(big_df['close'])
+        big_df['bb_lower'] = (bb_middle - 2 * bb_std).fillna(big_df['close'])
+        big_df['bb_middle'] = bb_middle.fillna(big_df['close'])
+
+        big_df['returns'] = grouped_close.transform('pct_change').fillna(0)
+
+        latest_rows = big_df.groupby('ticker', sort=False).tail(1)
+        return {
+            row['ticker']: _observation_from_row(row)
+            for _, row in latest_rows.iterrows()
+        }
+
+    except Exception as e:
+        logger.error(f"❌ Error calculating bulk indicators: {e}")
+        return {}
+
+
+def _ema(values: np.ndarray, period: int) -> np.ndarray:
+    """EMA of a 1-D float64 array via an IIR filter.
+
+    ewm(span=period, adjust=False) is the recursion
+    y[t] = alpha*x[t] + (1-alpha)*y[t-1]; lfilter runs it as a tight C loop,
+    seeded so y[0] == x[0] like pandas.
+    """
+    if values.size == 0:
+        return values.astype(np.float64)
+    alpha = 2.0 / (period + 1)
+    ema, _ = lfilter([alpha], [1.0, alpha - 1.0], values, zi=[(1.0 - alpha) * values[0]])
+    return ema
+
+
+def _rolling_reduce(values: np.ndarray, window: int, reducer) -> np.ndarray:
+    """Rolling reduction over a 1-D array; NaN for incomplete windows.
+
+    Uses a strided window view so the reducer runs as one contiguous
+    vectorised pass instead of per-window Python calls.
+    """
+    out = np.full(values.shape, np.nan)
+    if values.size >= window:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window)
+        out[window - 1:] = reducer(windows, axis=1)
+    return out
+
+
 def add_sma(df: pd.DataFrame, periods: list) -> pd.DataFrame:
     """Add Simple Moving Average"""
     for period in periods:
@@ -80,8 +317,9 @@ def add_sma(df: pd.DataFrame, periods: list) -> pd.DataFrame:
 
 def add_ema(df: pd.DataFrame, periods: list) -> pd.DataFrame:
     """Add Exponential Moving Average"""
+    close = df['close'].to_numpy(dtype=np.float64)
     for period in periods:
-        df[f'ema_{period}'] = df['close'].ewm(span=period, adjust=False).mean()
+        df[f'ema_{period}'] = _ema(close, period)
     return df
 
 
@@ -92,17 +330,23 @@ def add_rsi(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     RSI = 100 - (100 / (1 + RS))
     RS = Average Gain / Average Loss
     """
-    delta = df['close'].diff()
-    
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    
+    close = df['close'].to_numpy(dtype=np.float64)
+    delta = np.diff(close)
+
+    # One pass per side over contiguous float64, no masked Series copies
+    gain = np.concatenate(([0.0], np.where(delta > 0, delta, 0.0)))
+    loss = np.concatenate(([0.0], np.where(delta < 0, -delta, 0.0)))
+
+    avg_gain = _rolling_reduce(gain, period, np.mean)
+    avg_loss = _rolling_reduce(loss, period, np.mean)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = avg_gain / avg_loss
+        rsi = 100 - (100 / (1 + rs))
+
     # Fill NaN with neutral value
-    df['rsi'].fillna(50, inplace=True)
-    
+    df['rsi'] = np.where(np.isnan(rsi), 50.0, rsi)
+
     return df
 
 
@@ -114,18 +358,14 @@ def add_macd(df: pd.DataFrame, fast: int = 12, slow: int = 26, signal: int = 9)
     Signal = EMA(MACD, signal_period)
     Histogram = MACD - Signal
     """
-    ema_fast = df['close'].ewm(span=fast, adjust=False).mean()
-    ema_slow = df['close'].ewm(span=slow, adjust=False).mean()
-    
-    df['macd'] = ema_fast - ema_slow
-    df['macd_signal'] = df['macd'].ewm(span=signal, adjust=False).mean()
-    df['macd_hist'] = df['macd'] - df['macd_signal']
-    
-    # Fill NaN with 0
-    df['macd'].fillna(0, inplace=True)
-    df['macd_signal'].fillna(0, inplace=True)
-    df['macd_hist'].fillna(0, inplace=True)
-    
+    close = df['close'].to_numpy(dtype=np.float64)
+    macd = _ema(close, fast) - _ema(close, slow)
+    macd_signal = _ema(macd, signal)
+
+    df['macd'] = macd
+    df['macd_signal'] = macd_signal
+    df['macd_hist'] = macd - macd_signal
+
     return df
 
 
@@ -137,24 +377,20 @@ def add_bollinger_bands(df: pd.DataFrame, period: int = 20, std_dev: float = 2)
     Middle Band = SMA
     Lower Band = SMA - (std_dev × σ)
     """
-    df['bb_middle'] = df['close'].rolling(window=period).mean()
+    bb_middle = df['close'].rolling(window=period).mean()
     bb_std = df['close'].rolling(window=period).std()
-    
-    df['bb_upper'] = df['bb_middle'] + (std_dev * bb_std)
-    df['bb_lower'] = df['bb_middle'] - (std_dev * bb_std)
-    
-    # Fill NaN with current price
-    df['bb_middle'].fillna(df['close'], inplace=True)
-    df['bb_upper'].fillna(df['close'], inplace=True)
-    df['bb_lower'].fillna(df['close'], inplace=True)
-    
+
+    # Fill NaN with current price; assign once, no chained inplace fills
+    df['bb_middle'] = bb_middle.fillna(df['close'])
+    df['bb_upper'] = (bb_middle + std_dev * bb_std).fillna(df['close'])
+    df['bb_lower'] = (bb_middle - std_dev * bb_std).fillna(df['close'])
+
     return df
 
 
 def add_returns(df: pd.DataFrame) -> pd.DataFrame:
     """Add daily returns"""
-    df['returns'] = df['close'].pct_change()
-    df['returns'].fillna(0, inplace=True)
+    df['returns'] = df['close'].pct_change().fillna(0)
     return df
 
 
@@ -165,15 +401,26 @@ def add_atr(df: pd.DataFrame, period: int = 14) -> pd.DataFrame:
     TR = max[(high - low), abs(high - prev_close), abs(low - prev_close)]
     ATR = EMA(TR, period)
     """
-    high_low = df['high'] - df['low']
-    high_close = (df['high'] - df['close'].shift()).abs()
-    low_close = (df['low'] - df['close'].shift()).abs()
-    
-    true_range = pd.concat([high_low, high_close, low_close], axis=1).max(axis=1)
-    df['atr'] = true_range.ewm(span=period, adjust=False).mean()
-    
-    df['atr'].fillna(0, inplace=True)
-    
+    high = df['high'].to_numpy(dtype=np.float64)
+    low = df['low'].to_numpy(dtype=np.float64)
+    close = df['close'].to_numpy(dtype=np.float64)
+
+    if high.size == 0:
+        df['atr'] = np.empty(0)
+        return df
+
+    # Element-wise max over ndarrays instead of concatenating a 3-wide frame
+    true_range = high - low
+    if high.size > 1:
+        prev_close = close[:-1]
+        true_range[1:] = np.maximum.reduce([
+            true_range[1:],
+            np.abs(high[1:] - prev_close),
+            np.abs(low[1:] - prev_close),
+        ])
+
+    df['atr'] = _ema(true_range, period)
+
     return df
 
 
@@ -184,50 +431,88 @@ def add_stochastic_oscillator(df: pd.DataFrame, period: int = 14) -> pd.DataFram
     %K = (Close - Low(period)) / (High(period) - Low(period)) × 100
     %D = SMA(%K, 3)
     """
-    low_min = df['low'].rolling(window=period).min()
-    high_max = df['high'].rolling(window=period).max()
-    
-    df['stoch_k'] = 100 * (df['close'] - low_min) / (high_max - low_min)
-    df['stoch_d'] = df['stoch_k'].rolling(window=3).mean()
-    
-    df['stoch_k'].fillna(50, inplace=True)
-    df['stoch_d'].fillna(50, inplace=True)
-    
+    low_min = _rolling_reduce(df['low'].to_numpy(dtype=np.float64), period, np.min)
+    high_max = _rolling_reduce(df['high'].to_numpy(dtype=np.float64), period, np.max)
+
+    close = df['close'].to_numpy(dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        stoch_k = 100 * (close - low_min) / (high_max - low_min)
+    stoch_d = _rolling_reduce(stoch_k, 3, np.mean)
+
+    df['stoch_k'] = np.where(np.isnan(stoch_k), 50.0, stoch_k)
+    df['stoch_d'] = np.where(np.isnan(stoch_d), 50.0, stoch_d)
+
     return df
 
 
+def _obv_kernel(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """Single O(n) pass over contiguous arrays; JIT-compiled when numba is present."""
+    out = np.empty_like(volume)
+    out[0] = 0.0
+    for i in range(1, close.size):
+        if close[i] > close[i - 1]:
+            out[i] = out[i - 1] + volume[i]
+        elif close[i] < close[i - 1]:
+            out[i] = out[i - 1] - volume[i]
+        else:
+            out[i] = out[i - 1]
+    return out
+
+
+if _HAS_NUMBA:
+    _obv_kernel = njit(cache=True, fastmath=True)(_obv_kernel)
+
+
 def add_obv(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add On-Balance Volume
-    
+
     OBV increases/decreases by volume based on price direction
     """
-    obv = [0]
-    
-    for i in range(1, len(df)):
-        if df['close'].iloc[i] > df['close'].iloc[i-1]:
-            obv.append(obv[-1] + df['volume'].iloc[i])
-        elif df['close'].iloc[i] < df['close'].iloc[i-1]:
-            obv.append(obv[-1] - df['volume'].iloc[i])
-        else:
-            obv.append(obv[-1])
-    
-    df['obv'] = obv
-    
+    if len(df) == 0:
+        df['obv'] = np.empty(0)
+        return df
+
+    df['obv'] = _obv_kernel(
+        df['close'].to_numpy(dtype=np.float64),
+        df['volume'].to_numpy(dtype=np.float64),
+    )
+
     return df
 
 
+def _vwap_kernel(high: np.ndarray, low: np.ndarray, close: np.ndarray,
+                 volume: np.ndarray) -> np.ndarray:
+    """Fused cumulative price*volume / volume pass; falls back to close
+    while no volume has traded."""
+    out = np.empty_like(close)
+    num = 0.0
+    den = 0.0
+    for i in range(close.size):
+        typical = (high[i] + low[i] + close[i]) / 3.0
+        num += typical * volume[i]
+        den += volume[i]
+        out[i] = num / den if den > 0 else close[i]
+    return out
+
+
+if _HAS_NUMBA:
+    _vwap_kernel = njit(cache=True)(_vwap_kernel)
+
+
 def add_vwap(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add Volume Weighted Average Price (intraday only)
-    
+
     VWAP = Σ(Price × Volume) / Σ(Volume)
     """
-    typical_price = (df['high'] + df['low'] + df['close']) / 3
-    df['vwap'] = (typical_price * df['volume']).cumsum() / df['volume'].cumsum()
-    
-    df['vwap'].fillna(df['close'], inplace=True)
-    
+    df['vwap'] = _vwap_kernel(
+        df['high'].to_numpy(dtype=np.float64),
+        df['low'].to_numpy(dtype=np.float64),
+        df['close'].to_numpy(dtype=np.float64),
+        df['volume'].to_numpy(dtype=np.float64),
+    )
+
     return df
 
 
@@ -261,24 +546,23 @@ def calculate_max_drawdown(equity_curve: pd.Series) -> float:
     """
     if len(equity_curve) < 2:
         return 0.0
-    
-    running_max = equity_curve.expanding().max()
-    drawdown = (equity_curve - running_max) / running_max
-    
-    max_dd = drawdown.min()
-    
-    return float(max_dd * 100)  # Return as percentage
+
+    arr = equity_curve.to_numpy(dtype=np.float64)
+    running_max = np.maximum.accumulate(arr)
+    drawdown = (arr - running_max) / running_max
+
+    return float(drawdown.min() * 100)  # Return as percentage
 
 
 def calculate_win_rate(trades: pd.DataFrame) -> float:
     """Calculate percentage of winning trades"""
     if len(trades) == 0:
         return 0.0
-    
-    winning_trades = len(trades[trades['pnl'] > 0])
-    total_trades = len(trades)
-    
-    return (winning_trades / total_trades) * 100
+
+    pnl = trades['pnl'].to_numpy()
+    winning_trades = int(np.count_nonzero(pnl > 0))
+
+    return (winning_trades / pnl.size) * 100
 
 
 def calculate_profit_factor(trades: pd.DataFrame) -> float:
@@ -289,11 +573,34 @@ def calculate_profit_factor(trades: pd.DataFrame) -> float:
     """
     if len(trades) == 0:
         return 0.0
-    
-    gross_profit = trades[trades['pnl'] > 0]['pnl'].sum()
-    gross_loss = abs(trades[trades['pnl'] < 0]['pnl'].sum())
-    
+
+    pnl = trades['pnl'].to_numpy()
+    gross_profit = float(pnl[pnl > 0].sum())
+    gross_loss = float(-pnl[pnl < 0].sum())
+
     if gross_loss == 0:
         return float('inf') if gross_profit > 0 else 0.0
-    
-    return gross_profit / gross_loss
\ No newline at end of file
+
+    return gross_profit / gross_loss
+
+
+def _precompile() -> None:
+    """Warm the numba kernels at import time.
+
+    First-call JIT compilation costs ~0.5-2s per kernel; triggering it here
+    keeps that off the trading/training hot path.  cache=True persists the
+    machine code on disk, so only the very first run of a fresh checkout
+    actually compiles.
+    """
+    if not _HAS_NUMBA:
+        return
+    try:
+        dummy = np.zeros(2, dtype=np.float64)
+        _obv_kernel(dummy, dummy)
+        _latest_indicators_kernel(dummy)
+        _vwap_kernel(dummy, dummy, dummy, dummy)
+    except Exception:  # pragma: no cover - warm-up must never break imports
+        pass
+
+
+_precompile()
\ No newline at end of file
@@ -3,6 +3,8 @@ Trade Logger and Performance Tracker
 Logs all trades and tracks portfolio performance metrics
 """
 
+import atexit
+import numpy as np
 import pandas as pd
 import json
 import os
@@ -12,37 +14,333 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+try:  # pyarrow is optional: columnar trade log instead of per-trade CSV appends
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    _HAS_PYARROW = True
+except ImportError:  # pragma: no cover - exercised only without pyarrow
+    _HAS_PYARROW = False
+
+try:  # orjson is optional: faster (de)serialisation for the NDJSON log
+    import orjson
+
+    def _dump_line(obj) -> bytes:
+        return orjson.dumps(obj) + b'\n'
+
+    def _dump_bytes(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY)
+
+    _loads = orjson.loads
+except ImportError:  # pragma: no cover - exercised only without orjson
+    def _dump_line(obj) -> bytes:
+        return (json.dumps(obj) + '\n').encode()
+
+    def _dump_bytes(obj) -> bytes:
+        return json.dumps(obj).encode()
+
+    _loads = json.loads
+
+
+def _timestamp_ns(value) -> int:
+    """Convert an ISO timestamp to int64 epoch nanoseconds (0 if unparseable)."""
+    try:
+        return int(np.datetime64(value, 'ns').astype(np.int64))
+    except Exception:
+        try:
+            parsed = datetime.fromisoformat(str(value)).replace(tzinfo=None)
+            return int(np.datetime64(parsed, 'ns').astype(np.int64))
+        except Exception:
+            return 0
+
+
+_DAY_NS = 86_400_000_000_000
+
+# (date, midnight-ns) pair so tick-loop callers don't rebuild the same
+# boundary every call; refreshed only when the date actually rolls over
+_today_cache = (None, 0)
+
+
+def _today_midnight_ns() -> int:
+    """Epoch-ns of today's midnight, recomputed once per day."""
+    global _today_cache
+    today = datetime.now().date()
+    if today != _today_cache[0]:
+        _today_cache = (today, _timestamp_ns(today))
+    return _today_cache[1]
+
 
 class TradeLogger:
     """Logs all trading activity"""
-    
+
+    # Known trade fields persisted to the columnar log
+    FIELDS = ('timestamp', 'symbol', 'action', 'qty', 'price', 'pnl', 'order_id')
+
+    # Rows buffered in memory before a Parquet flush
+    FLUSH_EVERY = 32
+
     def __init__(self, log_file: str = "data/trades.csv"):
         self.log_file = log_file
-        self.trades = []
-        
+        self._buffer: List[Dict] = []
+
+        # Running summary counters: get_trade_summary stays O(1) instead of
+        # rebuilding a DataFrame over the whole history per call
+        self._buy_count = 0
+        self._sell_count = 0
+        self._pnl_count = 0
+        self._win_count = 0
+        self._total_pnl = 0.0
+
+        # Column-per-field storage instead of a list of dicts: numeric and
+        # categorical columns live in preallocated numpy arrays (grown by
+        # doubling), so filters and date queries run as C loops over
+        # contiguous memory and each row costs a few bytes instead of a
+        # dict. Query methods rebuild dicts only for the rows they return.
+        self._n = 0
+        self._ts_ns = np.empty(1024, dtype=np.int64)
+        self._sym = np.empty(1024, dtype=np.uint16)
+        self._act = np.empty(1024, dtype=np.uint8)
+        self._qty = np.empty(1024, dtype=np.float32)
+        self._price = np.empty(1024, dtype=np.float64)
+        self._pnl = np.empty(1024, dtype=np.float64)
+
+        # Free-form string columns stay as plain lists (O(1) appends, no
+        # fixed-width waste); symbols and actions are interned to small
+        # integer codes through these tables
+        self._ts_iso: List = []
+        self._order_id: List = []
+        self._symtab: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        self._acttab: Dict[str, int] = {}
+        self._actions: List[str] = []
+
+        # Per-symbol row index (parallel to self._symbols): symbol queries
+        # walk only their own rows instead of scanning the whole log
+        self._sym_rows: List[List[int]] = []
+
+        if _HAS_PYARROW:
+            # Dataset directory next to the CSV path: each flush appends one
+            # columnar fragment, so restarts never rewrite old data
+            self.dataset_dir = os.path.splitext(log_file)[0] + "_parquet"
+            self._schema = pa.schema([
+                ('timestamp', pa.string()),
+                ('symbol', pa.dictionary(pa.int32(), pa.string())),
+                ('action', pa.dictionary(pa.int32(), pa.string())),
+                ('qty', pa.float64()),
+                ('price', pa.float64()),
+                ('pnl', pa.float64()),
+                ('order_id', pa.string()),
+            ])
+            atexit.register(self.flush)
+
         # Create data directory
         os.makedirs("data", exist_ok=True)
-        
+
         # Load existing trades
         self._load_trades()
-    
+
     def _load_trades(self):
-        """Load trades from CSV file"""
-        if os.path.exists(self.log_file):
+        """Load trades from the Parquet dataset (or legacy CSV) file"""
+        if _HAS_PYARROW and os.path.isdir(self.dataset_dir):
             try:
-                df = pd.read_csv(self.log_file)
-                self.trades = df.to_dict('records')
-                logger.info(f"✅ Loaded {len(self.trades)} trades from {self.log_file}")
+                df = self._sort_by_timestamp(pq.read_table(self.dataset_dir).to_pandas())
+                self._ingest_frame(df)
+                logger.info(f"✅ Loaded {len(df)} trades from {self.dataset_dir}")
+            except Exception as e:
+                logger.error(f"❌ Error loading trades: {e}")
+        elif os.path.exists(self.log_file):
+            try:
+                # Arrow's multi-threaded CSV reader when available; either
+                # way the frame is ingested columnwise, never as row dicts
+                engine = 'pyarrow' if _HAS_PYARROW else 'c'
+                df = self._sort_by_timestamp(pd.read_csv(self.log_file, engine=engine))
+                self._ingest_frame(df)
+                if _HAS_PYARROW and len(df):
+                    # One-time migration: later loads prefer the dataset
+                    # directory, so seed it with the CSV history or the
+                    # pre-migration trades would vanish on the next restart
+                    self._migrate_legacy_csv(df)
+                logger.info(f"✅ Loaded {len(df)} trades from {self.log_file}")
             except Exception as e:
                 logger.error(f"❌ Error loading trades: {e}")
-                self.trades = []
         else:
             logger.info(f"📝 Creating new trade log: {self.log_file}")
-    
+
+    @staticmethod
+    def _sort_by_timestamp(df: pd.DataFrame) -> pd.DataFrame:
+        """Restore chronological order on a loaded frame
+
+        Parquet fragments concatenate in filename (GUID) order, not write
+        order, and the searchsorted date queries require _ts_ns sorted.
+        """
+        if 'timestamp' not in df.columns or len(df) < 2:
+            return df
+        parsed = pd.to_datetime(df['timestamp'], errors='coerce', format='ISO8601')
+        if parsed.is_monotonic_increasing:
+            return df
+        # Unparseable timestamps sort as 0, matching what _ingest_frame stores
+        ts_ns = parsed.to_numpy('datetime64[ns]').view('int64')
+        keys = np.where(parsed.isna().to_numpy(), 0, ts_ns)
+        return df.iloc[keys.argsort(kind='stable')].reset_index(drop=True)
+
+    def _migrate_legacy_csv(self, df: pd.DataFrame):
+        """One-time rewrite of the legacy CSV history as a Parquet fragment"""
+        if 'symbol' not in df.columns:
+            df = df.reindex(columns=self.FIELDS)
+        columns = {}
+        for field in self.FIELDS:
+            if field in ('qty', 'price', 'pnl'):
+                columns[field] = pd.to_numeric(df[field], errors='coerce')
+            else:
+                columns[field] = df[field].astype(str).where(df[field].notna(), None)
+        table = pa.Table.from_pandas(
+            pd.DataFrame(columns), schema=self._schema, preserve_index=False)
+        pq.write_to_dataset(table, root_path=self.dataset_dir)
+
+    @staticmethod
+    def _intern(value, table: Dict[str, int], values: List[str]) -> int:
+        """Map a string to its small integer code, adding it on first sight"""
+        key = str(value)
+        code = table.get(key)
+        if code is None:
+            code = len(values)
+            table[key] = code
+            values.append(key)
+        return code
+
+    @staticmethod
+    def _as_float(value) -> float:
+        """Coerce a possibly-missing numeric field to float (NaN if absent)"""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return float('nan')
+
+    def _ingest_frame(self, df: pd.DataFrame):
+        """Bulk-append a loaded DataFrame straight into the column arrays
+
+        Column-at-a-time equivalent of calling _ingest per row: coercions,
+        timestamp parsing and the summary counters all run vectorized, and
+        no intermediate dict is built per trade.
+        """
+        n = len(df)
+        if n == 0:
+            return
+        if 'symbol' not in df.columns:
+            df = df.reindex(columns=self.FIELDS)
+
+        while self._ts_ns.size < self._n + n:
+            size = self._ts_ns.size * 2
+            self._ts_ns = np.resize(self._ts_ns, size)
+            self._sym = np.resize(self._sym, size)
+            self._act = np.resize(self._act, size)
+            self._qty = np.resize(self._qty, size)
+            self._price = np.resize(self._price, size)
+            self._pnl = np.resize(self._pnl, size)
+
+        lo, hi = self._n, self._n + n
+
+        parsed = pd.to_datetime(df['timestamp'], errors='coerce', format='ISO8601')
+        ts_ns = parsed.to_numpy('datetime64[ns]').view('int64')
+        self._ts_ns[lo:hi] = np.where(parsed.isna().to_numpy(), 0, ts_ns)
+
+        # Intern only the distinct category values, then scatter their codes
+        for column, out, table, values in (
+            ('symbol', self._sym, self._symtab, self._symbols),
+            ('action', self._act, self._acttab, self._actions),
+        ):
+            cat = pd.Categorical(df[column].astype(str))
+            codes = np.array(
+                [self._intern(c, table, values) for c in cat.categories],
+                dtype=out.dtype,
+            )
+            out[lo:hi] = codes[cat.codes]
+            if column == 'symbol':
+                while len(self._sym_rows) < len(self._symbols):
+                    self._sym_rows.append([])
+                for ci, code in enumerate(codes):
+                    rows = np.nonzero(cat.codes == ci)[0] + lo
+                    self._sym_rows[code].extend(rows.tolist())
+
+        qty = pd.to_numeric(df['qty'], errors='coerce').to_numpy(np.float64)
+        price = pd.to_numeric(df['price'], errors='coerce').to_numpy(np.float64)
+        pnl = pd.to_numeric(df['pnl'], errors='coerce').to_numpy(np.float64)
+        self._qty[lo:hi] = qty
+        self._price[lo:hi] = price
+        self._pnl[lo:hi] = pnl
+
+        self._ts_iso.extend(df['timestamp'].tolist())
+        self._order_id.extend(df['order_id'].tolist())
+
+        actions = df['action'].to_numpy()
+        self._buy_count += int((actions == 'BUY').sum())
+        self._sell_count += int((actions == 'SELL').sum())
+
+        closed = (pnl != 0) & ~np.isnan(pnl)
+        self._pnl_count += int(closed.sum())
+        self._total_pnl += float(pnl[closed].sum())
+        self._win_count += int((pnl[closed] > 0).sum())
+
+        self._n = hi
+
+    def _ingest(self, trade: Dict):
+        """Append one trade to the column arrays and the running counters"""
+        action = trade.get('action')
+        if action == 'BUY':
+            self._buy_count += 1
+        elif action == 'SELL':
+            self._sell_count += 1
+
+        pnl = self._as_float(trade.get('pnl'))
+        if pnl != 0 and pnl == pnl:  # non-zero and not NaN
+            self._pnl_count += 1
+            self._total_pnl += pnl
+            if pnl > 0:
+                self._win_count += 1
+
+        if self._n == self._ts_ns.size:
+            size = self._ts_ns.size * 2
+            self._ts_ns = np.resize(self._ts_ns, size)
+            self._sym = np.resize(self._sym, size)
+            self._act = np.resize(self._act, size)
+            self._qty = np.resize(self._qty, size)
+            self._price = np.resize(self._price, size)
+            self._pnl = np.resize(self._pnl, size)
+
+        i = self._n
+        self._ts_ns[i] = _timestamp_ns(trade.get('timestamp'))
+        code = self._intern(trade.get('symbol'), self._symtab, self._symbols)
+        if code == len(self._sym_rows):
+            self._sym_rows.append([])
+        self._sym_rows[code].append(i)
+        self._sym[i] = code
+        self._act[i] = self._intern(action, self._acttab, self._actions)
+        self._qty[i] = self._as_float(trade.get('qty'))
+        self._price[i] = self._as_float(trade.get('price'))
+        self._pnl[i] = pnl
+        self._ts_iso.append(trade.get('timestamp'))
+        self._order_id.append(trade.get('order_id'))
+        self._n = i + 1
+
+    def _row(self, i: int) -> Dict:
+        """Materialise one stored trade back into a dict"""
+        qty = float(self._qty[i])
+        price = float(self._price[i])
+        pnl = float(self._pnl[i])
+        return {
+            'timestamp': self._ts_iso[i],
+            'symbol': self._symbols[self._sym[i]],
+            'action': self._actions[self._act[i]],
+            'qty': qty if qty == qty else None,
+            'price': price if price == price else None,
+            'pnl': pnl if pnl == pnl else None,
+            'order_id': self._order_id[i],
+        }
+
     def log_trade(self, trade: Dict):
         """
         Log a new trade
-        
+
         Args:
             trade: Dictionary with trade details
                 {timestamp, symbol, action, qty, price, pnl, order_id, ...}
@@ -51,60 +349,90 @@ class TradeLogger:
             # Add timestamp if not present
             if 'timestamp' not in trade:
                 trade['timestamp'] = datetime.now().isoformat()
-            
-            # Add to in-memory list
-            self.trades.append(trade)
-            
-            # Append to CSV file
-            df = pd.DataFrame([trade])
-            
-            # Write header if file doesn't exist
-            write_header = not os.path.exists(self.log_file)
-            
-            df.to_csv(
-                self.log_file,
-                mode='a',
-                header=write_header,
-                index=False
-            )
-            
-            logger.info(f"✅ Logged trade: {trade['action']} {trade['qty']} {trade['symbol']}")
-            
+
+            # Append to the in-memory columns
+            self._ingest(trade)
+
+            if _HAS_PYARROW:
+                # Buffer and flush in columnar batches instead of opening the
+                # file and serialising one row per trade
+                self._buffer.append(trade)
+                if len(self._buffer) >= self.FLUSH_EVERY:
+                    self.flush()
+            else:
+                # CSV fallback: append a single row, with columns pinned to
+                # FIELDS order so appended rows always line up with the header
+                df = pd.DataFrame([trade]).reindex(columns=self.FIELDS)
+                write_header = not os.path.exists(self.log_file)
+                df.to_csv(
+                    self.log_file,
+                    mode='a',
+                    header=write_header,
+                    index=False
+                )
+
+            logger.info("✅ Logged trade: %s %s %s", trade['action'], trade['qty'], trade['symbol'])
+
+        except Exception as e:
+            logger.error("❌ Error logging trade: %s", e)
+
+    def flush(self):
+        """Write buffered trades to the Parquet dataset"""
+        if not _HAS_PYARROW or not self._buffer:
+            return
+        try:
+            rows = []
+            for trade in self._buffer:
+                row = {}
+                for field in self.FIELDS:
+                    value = trade.get(field)
+                    if value is None:
+                        row[field] = None
+                    elif field in ('qty', 'price', 'pnl'):
+                        row[field] = float(value)
+                    else:
+                        row[field] = str(value)
+                rows.append(row)
+            table = pa.Table.from_pylist(rows, schema=self._schema)
+            pq.write_to_dataset(table, root_path=self.dataset_dir)
+            self._buffer.clear()
         except Exception as e:
-            logger.error(f"❌ Error logging trade: {e}")
+            logger.error("❌ Error flushing trades: %s", e)
     
     def get_recent_trades(self, limit: int = 50) -> List[Dict]:
         """Get most recent trades"""
-        return self.trades[-limit:]
-    
+        return [self._row(i) for i in range(max(self._n - limit, 0), self._n)]
+
     def get_today_trades(self) -> List[Dict]:
         """Get trades from today"""
-        today = datetime.now().date()
-        
-        today_trades = [
-            t for t in self.trades
-            if datetime.fromisoformat(t['timestamp']).date() == today
-        ]
-        
-        return today_trades
-    
+        start_ns = _today_midnight_ns()
+        end_ns = start_ns + _DAY_NS
+
+        ts = self._ts_ns[:self._n]
+        lo = int(np.searchsorted(ts, start_ns, 'left'))
+        hi = int(np.searchsorted(ts, end_ns, 'left'))
+        return [self._row(i) for i in range(lo, hi)]
+
     def get_trades_by_symbol(self, symbol: str) -> List[Dict]:
         """Get all trades for a specific symbol"""
-        return [t for t in self.trades if t['symbol'] == symbol]
-    
+        code = self._symtab.get(symbol)
+        if code is None:
+            return []
+        return [self._row(i) for i in self._sym_rows[code]]
+
     def get_trades_by_date_range(self, start_date: str, end_date: str) -> List[Dict]:
-        """Get trades within date range"""
-        start = datetime.fromisoformat(start_date)
-        end = datetime.fromisoformat(end_date)
-        
-        return [
-            t for t in self.trades
-            if start <= datetime.fromisoformat(t['timestamp']) <= end
-        ]
-    
+        """Get trades within date range (inclusive)"""
+        start_ns = _timestamp_ns(start_date)
+        end_ns = _timestamp_ns(end_date)
+
+        ts = self._ts_ns[:self._n]
+        lo = int(np.searchsorted(ts, start_ns, 'left'))
+        hi = int(np.searchsorted(ts, end_ns, 'right'))
+        return [self._row(i) for i in range(lo, hi)]
+
     def get_trade_summary(self) -> Dict:
-        """Get summary statistics"""
-        if not self.trades:
+        """Get summary statistics (O(1) from the running counters)"""
+        if self._n == 0:
             return {
                 "total_trades": 0,
                 "buy_trades": 0,
@@ -113,31 +441,21 @@ class TradeLogger:
                 "win_rate": 0,
                 "avg_pnl": 0
             }
-        
-        df = pd.DataFrame(self.trades)
-        
-        # Calculate metrics
-        total_trades = len(df)
-        buy_trades = len(df[df['action'] == 'BUY'])
-        sell_trades = len(df[df['action'] == 'SELL'])
-        
-        # PnL metrics (only for closed positions)
-        pnl_trades = df[df.get('pnl', 0) != 0]
-        
-        if len(pnl_trades) > 0:
-            total_pnl = pnl_trades['pnl'].sum()
-            winning_trades = len(pnl_trades[pnl_trades['pnl'] > 0])
-            win_rate = (winning_trades / len(pnl_trades)) * 100
-            avg_pnl = pnl_trades['pnl'].mean()
+
+        # PnL metrics cover only closed positions (non-zero pnl)
+        if self._pnl_count > 0:
+            total_pnl = self._total_pnl
+            win_rate = (self._win_count / self._pnl_count) * 100
+            avg_pnl = self._total_pnl / self._pnl_count
         else:
             total_pnl = 0
             win_rate = 0
             avg_pnl = 0
-        
+
         return {
-            "total_trades": total_trades,
-            "buy_trades": buy_trades,
-            "sell_trades": sell_trades,
+            "total_trades": self._n,
+            "buy_trades": self._buy_count,
+            "sell_trades": self._sell_count,
             "total_pnl": float(total_pnl),
             "win_rate": float(win_rate),
             "avg_pnl": float(avg_pnl)
@@ -151,19 +469,86 @@ class PerformanceTracker:
         self.perf_file = perf_file
         self.equity_history = []
         self.daily_returns = []
-        
+
+        # Contiguous equity values with parallel epoch-ns timestamps
+        # (doubling growth): get_metrics runs pure numpy over the values and
+        # get_daily_pnl binary-searches the timestamps instead of re-parsing
+        # ISO strings from the tail
+        self._values = np.empty(1024, dtype=np.float64)
+        self._ts_ns = np.empty(1024, dtype=np.int64)
+        self._n = 0
+
+        # Append-only NDJSON log: one line per update instead of rewriting
+        # the whole JSON document every tick
+        self.ndjson_file = os.path.splitext(perf_file)[0] + ".ndjson"
+
         # Create data directory
         os.makedirs("data", exist_ok=True)
-        
+
         # Load existing performance data
+        migrate = not os.path.exists(self.ndjson_file) and os.path.exists(self.perf_file)
         self._load_performance()
+
+        for entry in self.equity_history:
+            self._append_point(entry.get('timestamp'), entry.get('value', 0.0))
+
+        self._fh = open(self.ndjson_file, 'ab')
+        atexit.register(self._fh.close)
+
+        if migrate and self.equity_history:
+            self._migrate_legacy_json()
+
+    def _migrate_legacy_json(self):
+        """One-time rewrite of the legacy JSON history as NDJSON lines"""
+        returns_by_ts = {r['timestamp']: r['return'] for r in self.daily_returns}
+        for entry in self.equity_history:
+            self._fh.write(_dump_line({
+                't': entry['timestamp'],
+                'v': entry['value'],
+                'r': returns_by_ts.get(entry['timestamp']),
+            }))
+        self._fh.flush()
+
+    def _append_point(self, timestamp, value: float):
+        """Append one equity point to the contiguous arrays"""
+        if self._n == self._values.size:
+            self._values = np.resize(self._values, self._values.size * 2)
+            self._ts_ns = np.resize(self._ts_ns, self._ts_ns.size * 2)
+        self._values[self._n] = float(value)
+        self._ts_ns[self._n] = _timestamp_ns(timestamp)
+        self._n += 1
     
     def _load_performance(self):
-        """Load performance history from file"""
+        """Load performance history from the NDJSON log (or legacy JSON) file"""
+        if os.path.exists(self.ndjson_file):
+            try:
+                with open(self.ndjson_file, 'rb') as f:
+                    for line in f:
+                        if not line.strip():
+                            continue
+                        entry = _loads(line)
+                        self.equity_history.append({
+                            'timestamp': entry['t'],
+                            'value': entry['v'],
+                        })
+                        if entry.get('r') is not None:
+                            self.daily_returns.append({
+                                'timestamp': entry['t'],
+                                'return': entry['r'],
+                            })
+
+                logger.info(f"✅ Loaded {len(self.equity_history)} data points")
+                return
+
+            except Exception as e:
+                logger.error(f"❌ Error loading performance: {e}")
+                self.equity_history = []
+                self.daily_returns = []
+
         if os.path.exists(self.perf_file):
             try:
-                with open(self.perf_file, 'r') as f:
-                    data = json.load(f)
+                with open(self.perf_file, 'rb') as f:
+                    data = _loads(f.read())
                     self.equity_history = data.get('equity_history', [])
                     self.daily_returns = data.get('daily_returns', [])
                 
@@ -175,7 +560,7 @@ class PerformanceTracker:
                 self.daily_returns = []
     
     def _save_performance(self):
-        """Save performance history to file"""
+        """Write a full legacy-JSON snapshot (updates normally append NDJSON)"""
         try:
             data = {
                 'equity_history': self.equity_history,
@@ -183,8 +568,8 @@ class PerformanceTracker:
                 'last_updated': datetime.now().isoformat()
             }
             
-            with open(self.perf_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            with open(self.perf_file, 'wb') as f:
+                f.write(_dump_bytes(data))
             
         except Exception as e:
             logger.error(f"❌ Error saving performance: {e}")
@@ -205,24 +590,31 @@ class PerformanceTracker:
                 'timestamp': timestamp,
                 'value': portfolio_value
             })
+            self._append_point(timestamp, portfolio_value)
             
             # Calculate daily return
+            daily_return = None
             if len(self.equity_history) > 1:
                 prev_value = self.equity_history[-2]['value']
                 daily_return = (portfolio_value - prev_value) / prev_value
-                
+
                 self.daily_returns.append({
                     'timestamp': timestamp,
                     'return': daily_return
                 })
+
+            # Append one NDJSON line: O(1) regardless of history length
+            self._fh.write(_dump_line({
+                't': timestamp,
+                'v': portfolio_value,
+                'r': daily_return,
+            }))
+            self._fh.flush()
             
-            # Save to file
-            self._save_performance()
-            
-            logger.info(f"✅ Updated performance: ${portfolio_value:,.2f}")
+            logger.info("✅ Updated performance: $%.2f", portfolio_value)
             
         except Exception as e:
-            logger.error(f"❌ Error updating performance: {e}")
+            logger.error("❌ Error updating performance: %s", e)
     
     def get_equity_curve(self, days: int = 30) -> List[Dict]:
         """Get equity curve for last N days"""
@@ -249,33 +641,32 @@ class PerformanceTracker:
                 "volatility": 0
             }
         
-        # Convert to pandas for calculations
-        df = pd.DataFrame(self.equity_history)
-        df['timestamp'] = pd.to_datetime(df['timestamp'])
-        df = df.sort_values('timestamp')
-        
+        # Pure numpy over the contiguous equity array (updates append in
+        # chronological order, so no sort is needed)
+        values = self._values[:self._n]
+
         # Total return
-        initial_value = df['value'].iloc[0]
-        current_value = df['value'].iloc[-1]
+        initial_value = values[0]
+        current_value = values[-1]
         total_return = ((current_value - initial_value) / initial_value) * 100
-        
-        # Daily returns
-        df['daily_return'] = df['value'].pct_change()
-        returns = df['daily_return'].dropna()
-        
+
+        # Daily returns (ddof=1 matches the previous pandas .std())
+        returns = np.diff(values) / values[:-1]
+        returns_std = returns.std(ddof=1) if returns.size > 1 else 0.0
+
         # Sharpe ratio (annualized)
-        if len(returns) > 0 and returns.std() != 0:
-            sharpe_ratio = (returns.mean() / returns.std()) * (252 ** 0.5)
+        if returns.size > 0 and returns_std != 0:
+            sharpe_ratio = (returns.mean() / returns_std) * (252 ** 0.5)
         else:
             sharpe_ratio = 0
-        
+
         # Max drawdown
-        running_max = df['value'].expanding().max()
-        drawdown = (df['value'] - running_max) / running_max
+        running_max = np.maximum.accumulate(values)
+        drawdown = (values - running_max) / running_max
         max_drawdown = drawdown.min() * 100
-        
+
         # Volatility (annualized)
-        volatility = returns.std() * (252 ** 0.5) * 100
+        volatility = returns_std * (252 ** 0.5) * 100
         
         return {
             "total_return": float(total_return),
@@ -287,28 +678,22 @@ class PerformanceTracker:
     
     def get_daily_pnl(self) -> float:
         """Get today's P&L"""
-        if len(self.equity_history) < 2:
+        if self._n < 2:
             return 0.0
-        
-        today = datetime.now().date()
-        
-        # Find today's and yesterday's values
-        today_value = None
-        yesterday_value = None
-        
-        for i in range(len(self.equity_history) - 1, -1, -1):
-            entry = self.equity_history[i]
-            entry_date = datetime.fromisoformat(entry['timestamp']).date()
-            
-            if entry_date == today and today_value is None:
-                today_value = entry['value']
-            elif entry_date < today and yesterday_value is None:
-                yesterday_value = entry['value']
-                break
-        
+
+        # Binary-search the midnight boundary in the epoch-ns array: the
+        # latest value is today's if it sits past the boundary, and the
+        # entry just before the boundary is yesterday's close
+        today_start = _today_midnight_ns()
+        ts = self._ts_ns[:self._n]
+        idx = int(np.searchsorted(ts, today_start, 'left'))
+
+        today_value = self._values[self._n - 1] if ts[-1] >= today_start else None
+        yesterday_value = self._values[idx - 1] if idx > 0 else None
+
         if today_value and yesterday_value:
-            return today_value - yesterday_value
-        
+            return float(today_value - yesterday_value)
+
         return 0.0
     
     def generate_report(self) -> Dict:
@@ -0,0 +1,218 @@
+"""
+Streaming Technical Indicators
+Maintains per-ticker indicator state that advances in O(1) per new bar,
+instead of recomputing full rolling histories every morning
+"""
+
+import math
+import os
+import pickle
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+STATE_DIR = "data/indicator_state"
+
+# EMA smoothing factors (alpha = 2 / (span + 1))
+_ALPHA_12 = 2.0 / 13.0
+_ALPHA_26 = 2.0 / 27.0
+_ALPHA_9 = 2.0 / 10.0
+
+_RSI_PERIOD = 14
+_BB_PERIOD = 20
+
+
+@dataclass
+class IndicatorState:
+    """Running indicator state for a single ticker.
+
+    Holds exactly what is needed to advance every indicator by one bar:
+    EMA accumulators, rolling-sum windows for the SMAs, Wilder averages for
+    RSI, and the previous close for returns.
+    """
+
+    ema_12: Optional[float] = None
+    ema_26: Optional[float] = None
+    macd_signal: float = 0.0
+
+    sma_20_window: deque = field(default_factory=lambda: deque(maxlen=20))
+    sma_20_sum: float = 0.0
+    sma_20_sumsq: float = 0.0
+
+    sma_50_window: deque = field(default_factory=lambda: deque(maxlen=50))
+    sma_50_sum: float = 0.0
+
+    rsi_avg_gain: Optional[float] = None
+    rsi_avg_loss: Optional[float] = None
+    delta_count: int = 0
+
+    last_close: Optional[float] = None
+    last_timestamp: Optional[str] = None
+    last_observation: Optional[Dict] = None
+
+
+def _advance_window(window: deque, total: float, value: float) -> float:
+    """Push ``value`` into a fixed-size window and return the new sum"""
+    if len(window) == window.maxlen:
+        total -= window[0]
+    window.append(value)
+    return total + value
+
+
+def advance(state: IndicatorState, bar: Dict) -> Dict:
+    """
+    Advance the indicator state by one bar and return the observation
+
+    Every update is O(1): EMAs apply one smoothing step, the SMA windows
+    subtract the evicted value and add the new one, and RSI uses Wilder
+    smoothing for the average gain/loss.
+
+    Args:
+        state: Mutable per-ticker state (updated in place)
+        bar: Dictionary with at least close/open/high/low/volume
+
+    Returns:
+        Observation dictionary with the same keys as calculate_indicators
+    """
+    close = float(bar['close'])
+
+    # EMAs (seeded with the first close, matching ewm(adjust=False))
+    state.ema_12 = close if state.ema_12 is None else _ALPHA_12 * close + (1 - _ALPHA_12) * state.ema_12
+    state.ema_26 = close if state.ema_26 is None else _ALPHA_26 * close + (1 - _ALPHA_26) * state.ema_26
+
+    macd = state.ema_12 - state.ema_26
+    state.macd_signal = _ALPHA_9 * macd + (1 - _ALPHA_9) * state.macd_signal
+
+    # SMAs via running window sums
+    if len(state.sma_20_window) == _BB_PERIOD:
+        evicted = state.sma_20_window[0]
+        state.sma_20_sumsq -= evicted * evicted
+    state.sma_20_sum = _advance_window(state.sma_20_window, state.sma_20_sum, close)
+    state.sma_20_sumsq += close * close
+    state.sma_50_sum = _advance_window(state.sma_50_window, state.sma_50_sum, close)
+
+    if len(state.sma_20_window) == _BB_PERIOD:
+        sma_20 = state.sma_20_sum / _BB_PERIOD
+        variance = max(
+            (state.sma_20_sumsq - state.sma_20_sum * state.sma_20_sum / _BB_PERIOD)
+            / (_BB_PERIOD - 1),
+            0.0,
+        )
+        bb_std = math.sqrt(variance)
+        bb_upper = sma_20 + 2 * bb_std
+        bb_lower = sma_20 - 2 * bb_std
+        bb_middle = sma_20
+    else:
+        sma_20 = float('nan')
+        bb_upper = bb_lower = bb_middle = close
+
+    sma_50 = (
+        state.sma_50_sum / 50 if len(state.sma_50_window) == 50 else float('nan')
+    )
+
+    # RSI with Wilder smoothing
+    if state.last_close is not None:
+        delta = close - state.last_close
+        gain = max(delta, 0.0)
+        loss = max(-delta, 0.0)
+        state.delta_count += 1
+
+        if state.rsi_avg_gain is None:
+            state.rsi_avg_gain = gain
+            state.rsi_avg_loss = loss
+        else:
+            state.rsi_avg_gain = (state.rsi_avg_gain * (_RSI_PERIOD - 1) + gain) / _RSI_PERIOD
+            state.rsi_avg_loss = (state.rsi_avg_loss * (_RSI_PERIOD - 1) + loss) / _RSI_PERIOD
+
+    if state.delta_count >= _RSI_PERIOD and state.rsi_avg_loss:
+        rsi = 100 - (100 / (1 + state.rsi_avg_gain / state.rsi_avg_loss))
+    elif state.delta_count >= _RSI_PERIOD and state.rsi_avg_gain:
+        rsi = 100.0
+    else:
+        rsi = 50.0
+
+    returns = (
+        (close - state.last_close) / state.last_close
+        if state.last_close not in (None, 0)
+        else 0.0
+    )
+
+    state.last_close = close
+    if 'date' in bar and bar['date'] is not None:
+        state.last_timestamp = str(bar['date'])
+
+    state.last_observation = {
+        'close': close,
+        'open': float(bar.get('open', close)),
+        'high': float(bar.get('high', close)),
+        'low': float(bar.get('low', close)),
+        'volume': float(bar.get('volume', 0)),
+        'sma_20': sma_20,
+        'sma_50': sma_50,
+        'ema_12': state.ema_12,
+        'ema_26': state.ema_26,
+        'rsi': rsi,
+        'macd': macd,
+        'macd_signal': state.macd_signal,
+        'macd_hist': macd - state.macd_signal,
+        'bb_upper': bb_upper,
+        'bb_middle': bb_middle,
+        'bb_lower': bb_lower,
+        'returns': returns
+    }
+
+    return state.last_observation
+
+
+def update_from_frame(state: IndicatorState, df) -> Optional[Dict]:
+    """
+    Advance the state with every bar in *df* newer than the stored timestamp
+
+    On the first run this warms the state up over the full history; on
+    subsequent daily runs only the new bar(s) are processed.
+
+    Returns:
+        The latest observation dictionary, or None if the state has never
+        seen a bar
+    """
+    observation = state.last_observation
+
+    for bar in df.to_dict('records'):
+        timestamp = str(bar.get('date')) if bar.get('date') is not None else None
+        if (
+            timestamp is not None
+            and state.last_timestamp is not None
+            and timestamp <= state.last_timestamp
+        ):
+            continue
+        observation = advance(state, bar)
+
+    return observation
+
+
+def load_state(ticker: str, directory: str = STATE_DIR) -> Optional[IndicatorState]:
+    """Load the persisted indicator state for a ticker, if any"""
+    path = os.path.join(directory, f"{ticker}.pkl")
+
+    if not os.path.exists(path):
+        return None
+
+    try:
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+    except Exception as e:
+        logger.error(f"❌ Error loading indicator state for {ticker}: {e}")
+        return None
+
+
+def save_state(ticker: str, state: IndicatorState, directory: str = STATE_DIR):
+    """Persist the indicator state for a ticker"""
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"{ticker}.pkl"), 'wb') as f:
+            pickle.dump(state, f)
+    except Exception as e:
+        logger.error(f"❌ Error saving indicator state for {ticker}: {e}")
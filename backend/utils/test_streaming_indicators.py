@@ -0,0 +1,63 @@
+"""Tests for streaming indicator state."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.utils.indicators import calculate_indicators
+from backend.utils.streaming_indicators import IndicatorState, update_from_frame
+
+
+def _make_frame(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame(
+        {
+            "date": pd.date_range("2024-01-01", periods=n).astype(str),
+            "close": close,
+            "open": close,
+            "high": close + 1,
+            "low": close - 1,
+            "volume": np.full(n, 1_000_000.0),
+        }
+    )
+
+
+def test_warmup_matches_batch_indicators():
+    """Advancing over full history should reproduce the batch window stats."""
+
+    df = _make_frame(120)
+    state = IndicatorState()
+
+    observation = update_from_frame(state, df)
+    batch = calculate_indicators(df)
+
+    for key in ("close", "sma_20", "sma_50", "ema_12", "ema_26", "macd", "returns"):
+        assert observation[key] == pytest.approx(batch[key], rel=1e-6, abs=1e-6)
+
+
+def test_incremental_bar_matches_full_recompute():
+    """One O(1) advance on a new bar should match recomputing from scratch."""
+
+    df = _make_frame(120)
+    state = IndicatorState()
+    update_from_frame(state, df)
+
+    new_close = df["close"].iloc[-1] + 1.0
+    new_bar = pd.DataFrame(
+        {
+            "date": ["2024-06-01"],
+            "close": [new_close],
+            "open": [new_close],
+            "high": [new_close + 1],
+            "low": [new_close - 1],
+            "volume": [1_000_000.0],
+        }
+    )
+    extended = pd.concat([df, new_bar], ignore_index=True)
+
+    observation = update_from_frame(state, extended)
+    batch = calculate_indicators(extended)
+
+    for key in ("sma_20", "sma_50", "bb_upper", "bb_lower", "ema_12", "returns"):
+        assert observation[key] == pytest.approx(batch[key], rel=1e-6, abs=1e-6)
@@ -3,10 +3,13 @@ Alpaca Trading Integration
 Handles order execution, position management, and portfolio tracking
 """
 
+import asyncio
 import os
+import time
 import numpy as np
+import pandas as pd
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 import logging
 
 try:
@@ -18,18 +21,33 @@ except ImportError:
     ALPACA_AVAILABLE = False
     logging.warning("⚠️ alpaca-py not installed. Running in simulation mode.")
 
+try:  # requests-cache is optional: short-TTL HTTP caching for Alpaca GETs
+    import requests_cache
+    _HAS_REQUESTS_CACHE = True
+except ImportError:  # pragma: no cover - exercised only without requests-cache
+    _HAS_REQUESTS_CACHE = False
+
 logger = logging.getLogger(__name__)
 
 
 class AlpacaTrader:
     """Alpaca API wrapper for automated trading"""
-    
+
+    # How long a prefetched price stays fresh enough to trade on
+    PRICE_TTL = 0.5
+
     def __init__(self):
         self.api_key = os.getenv("APCA_API_KEY_ID")
         self.api_secret = os.getenv("APCA_API_SECRET_KEY")
         self.paper = os.getenv("APCA_PAPER", "true").lower() == "true"
         self.client = None
         self.connected = False
+        # symbol -> (price, monotonic timestamp); filled by prefetch_prices
+        self._price_cache: Dict[str, Tuple[float, float]] = {}
+        # Short-TTL account cache: one REST call per tick instead of one per
+        # method that needs equity/cash
+        self._account = None
+        self._account_ts = 0.0
         
     def connect(self):
         """Connect to Alpaca API"""
@@ -49,11 +67,25 @@ class AlpacaTrader:
                 secret_key=self.api_secret,
                 paper=self.paper
             )
-            
-            # Test connection
+
+            if _HAS_REQUESTS_CACHE:
+                # Swap the SDK's session for an in-memory cached one:
+                # identical GETs (account, positions, bars) within a second
+                # are answered from RAM instead of hitting the REST API
+                self.client._session = requests_cache.CachedSession(
+                    backend='memory',
+                    expire_after=1,
+                    allowable_methods=('GET',),
+                    cache_control=True,
+                )
+
+            # Test connection; keep the account so the first portfolio
+            # call reuses it instead of fetching again
             account = self.client.get_account()
+            self._account = account
+            self._account_ts = time.monotonic()
             self.connected = True
-            
+
             logger.info(f"✅ Connected to Alpaca ({'Paper' if self.paper else 'Live'} Trading)")
             logger.info(f"💰 Account Equity: ${float(account.equity):,.2f}")
             
@@ -64,13 +96,35 @@ class AlpacaTrader:
             self.connected = False
             return False
     
+    # How long a fetched account object stays fresh
+    ACCOUNT_TTL = 0.25
+
+    def _get_account_cached(self):
+        """Account object, refreshed at most once per ACCOUNT_TTL seconds"""
+        now = time.monotonic()
+        if self._account is None or now - self._account_ts > self.ACCOUNT_TTL:
+            self._account = self.client.get_account()
+            self._account_ts = now
+        return self._account
+
+    def invalidate_account(self):
+        """Drop the cached account (call after anything that changes it)"""
+        self._account = None
+        if _HAS_REQUESTS_CACHE and self.client is not None:
+            # Also clear the HTTP-level cache: within its expire_after
+            # window it would re-serve the pre-fill account response and
+            # the next order would size against stale equity
+            cache = getattr(getattr(self.client, '_session', None), 'cache', None)
+            if cache is not None:
+                cache.clear()
+
     def get_portfolio_summary(self) -> Dict:
         """Get current portfolio overview"""
         if not self.connected or not self.client:
             return self._get_mock_portfolio()
         
         try:
-            account = self.client.get_account()
+            account = self._get_account_cached()
             positions = self.client.get_all_positions()
             
             # Calculate day P&L
@@ -94,7 +148,7 @@ class AlpacaTrader:
                 "total_pnl": total_pnl,
                 "total_pnl_percent": total_pnl_pct,
                 "position_count": len(positions),
-                "positions": [self._format_position(p) for p in positions]
+                "positions": self._format_positions(positions)
             }
             
         except Exception as e:
@@ -108,31 +162,106 @@ class AlpacaTrader:
         
         try:
             positions = self.client.get_all_positions()
-            return [self._format_position(p) for p in positions]
+            return self._format_positions(positions)
         except Exception as e:
             logger.error(f"❌ Error getting positions: {e}")
             return []
     
     def _format_position(self, position) -> Dict:
-        """Format position data"""
-        current_price = float(position.current_price)
-        avg_price = float(position.avg_entry_price)
-        qty = float(position.qty)
-        
-        pnl = (current_price - avg_price) * qty
-        pnl_pct = ((current_price - avg_price) / avg_price * 100) if avg_price > 0 else 0
-        
+        """Format a single position"""
+        return self._format_positions([position])[0]
+
+    def _format_positions(self, positions) -> List[Dict]:
+        """Format positions columnwise: numeric coercion and pnl arithmetic
+        run once per column instead of once per position"""
+        if not positions:
+            return []
+
+        df = pd.DataFrame([
+            {
+                "symbol": p.symbol,
+                "qty": p.qty,
+                "avg_price": p.avg_entry_price,
+                "current_price": p.current_price,
+                "market_value": p.market_value,
+                "side": p.side,
+            }
+            for p in positions
+        ])
+
+        for column in ("qty", "avg_price", "current_price", "market_value"):
+            df[column] = pd.to_numeric(df[column], errors="coerce")
+
+        df["pnl"] = (df["current_price"] - df["avg_price"]) * df["qty"]
+        df["pnl_percent"] = np.where(
+            df["avg_price"] > 0,
+            (df["current_price"] - df["avg_price"]) / df["avg_price"] * 100,
+            0.0,
+        )
+
+        columns = ("symbol", "qty", "avg_price", "current_price",
+                   "market_value", "pnl", "pnl_percent", "side")
+        return df[list(columns)].to_dict("records")
+    
+    def prefetch_prices(self, tickers: List[str]):
+        """
+        Warm the price cache with one batched lookup
+
+        Call this once before a per-ticker execute_trade loop: the N
+        single-symbol HTTP round-trips collapse into one request and each
+        trade then hits the cache inside PRICE_TTL.
+        """
+        if not self.connected or not self.client or not tickers:
+            return
+
+        try:
+            bars = self.client.get_latest_bars(list(tickers))
+            now = time.monotonic()
+            for symbol, bar in bars.items():
+                self._price_cache[symbol] = (float(bar.c), now)
+        except Exception as e:
+            logger.error("❌ Error prefetching prices: %s", e)
+
+    def _get_price_cached(self, ticker: str) -> Optional[float]:
+        """Latest price from the cache, falling back to a single lookup"""
+        entry = self._price_cache.get(ticker)
+        if entry is not None and time.monotonic() - entry[1] < self.PRICE_TTL:
+            return entry[0]
+
+        try:
+            bars = self.client.get_latest_bar(ticker)
+            price = float(bars.c)
+        except Exception:
+            return None
+
+        self._price_cache[ticker] = (price, time.monotonic())
+        return price
+
+    def _place_market_order(self, ticker: str, action: str, qty: int,
+                            price: float) -> Dict:
+        """Submit a market order and build the trade-result dict"""
+        order_data = MarketOrderRequest(
+            symbol=ticker,
+            qty=qty,
+            side=OrderSide.BUY if action == "BUY" else OrderSide.SELL,
+            time_in_force=TimeInForce.DAY
+        )
+
+        order = self.client.submit_order(order_data)
+        self.invalidate_account()
+
+        logger.info("✅ %s order placed: %d shares of %s", action, qty, ticker)
+
         return {
-            "symbol": position.symbol,
+            "timestamp": datetime.now().isoformat(),
+            "symbol": ticker,
+            "action": action,
             "qty": qty,
-            "avg_price": avg_price,
-            "current_price": current_price,
-            "market_value": float(position.market_value),
-            "pnl": pnl,
-            "pnl_percent": pnl_pct,
-            "side": position.side
+            "price": price,
+            "order_id": str(order.id),
+            "status": order.status
         }
-    
+
     def execute_trade(self, ticker: str, action: str, position_size: float) -> Optional[Dict]:
         """
         Execute trade based on RL model signal
@@ -143,53 +272,23 @@ class AlpacaTrader:
             position_size: Fraction of portfolio (0-1)
         """
         if not self.connected or not self.client:
-            logger.info(f"🔧 Simulation: {action} {ticker} (size: {position_size:.2%})")
+            logger.info("🔧 Simulation: %s %s (size: %.2f%%)", action, ticker, position_size * 100)
             return self._simulate_trade(ticker, action, position_size)
         
         try:
-            account = self.client.get_account()
-            equity = float(account.equity)
-            
-            # Calculate quantity based on position size
+            # Side-specific part: work out the price and quantity. The
+            # shared order-build/submit/return tail lives in
+            # _place_market_order so it exists (and is optimized) once.
             if action == "BUY":
-                # Get current price
-                try:
-                    bars = self.client.get_latest_bar(ticker)
-                    current_price = float(bars.c)
-                except:
-                    logger.error(f"❌ Could not get price for {ticker}")
-                    return None
-                
-                # Calculate shares to buy
-                dollar_amount = equity * position_size
-                qty = int(dollar_amount / current_price)
-                
-                if qty < 1:
-                    logger.warning(f"⚠️ Quantity too small for {ticker}")
+                # Get current price (prefetched batch cache first)
+                current_price = self._get_price_cached(ticker)
+                if current_price is None:
+                    logger.error("❌ Could not get price for %s", ticker)
                     return None
-                
-                # Place buy order
-                order_data = MarketOrderRequest(
-                    symbol=ticker,
-                    qty=qty,
-                    side=OrderSide.BUY,
-                    time_in_force=TimeInForce.DAY
-                )
-                
-                order = self.client.submit_order(order_data)
-                
-                logger.info(f"✅ BUY order placed: {qty} shares of {ticker}")
-                
-                return {
-                    "timestamp": datetime.now().isoformat(),
-                    "symbol": ticker,
-                    "action": "BUY",
-                    "qty": qty,
-                    "price": current_price,
-                    "order_id": str(order.id),
-                    "status": order.status
-                }
-            
+
+                equity = float(self._get_account_cached().equity)
+                qty = int(equity * position_size / current_price)
+
             elif action == "SELL":
                 # Get current position
                 try:
@@ -197,42 +296,41 @@ class AlpacaTrader:
                     current_qty = float(position.qty)
                     current_price = float(position.current_price)
                 except:
-                    logger.warning(f"⚠️ No position found for {ticker}")
+                    logger.warning("⚠️ No position found for %s", ticker)
                     return None
-                
-                # Calculate shares to sell
+
                 qty = int(current_qty * position_size)
-                
-                if qty < 1:
-                    logger.warning(f"⚠️ Quantity too small for {ticker}")
-                    return None
-                
-                # Place sell order
-                order_data = MarketOrderRequest(
-                    symbol=ticker,
-                    qty=qty,
-                    side=OrderSide.SELL,
-                    time_in_force=TimeInForce.DAY
-                )
-                
-                order = self.client.submit_order(order_data)
-                
-                logger.info(f"✅ SELL order placed: {qty} shares of {ticker}")
-                
-                return {
-                    "timestamp": datetime.now().isoformat(),
-                    "symbol": ticker,
-                    "action": "SELL",
-                    "qty": qty,
-                    "price": current_price,
-                    "order_id": str(order.id),
-                    "status": order.status
-                }
-        
+
+            else:
+                return None
+
+            if qty < 1:
+                logger.warning("⚠️ Quantity too small for %s", ticker)
+                return None
+
+            return self._place_market_order(ticker, action, qty, current_price)
+
         except Exception as e:
-            logger.error(f"❌ Error executing trade for {ticker}: {e}")
+            logger.error("❌ Error executing trade for %s: %s", ticker, e)
             return None
     
+    async def execute_trades_batch(self, signals: List[Tuple[str, str, float]]) -> List[Optional[Dict]]:
+        """
+        Execute several trades concurrently
+
+        Each signal is (ticker, action, position_size) as taken by
+        execute_trade. The price cache is warmed once for the whole batch,
+        then the blocking submissions run in worker threads so their HTTP
+        round-trips overlap instead of serialising at ~100 ms each.
+        Results come back in signal order (None where a trade was skipped).
+        """
+        await asyncio.to_thread(
+            self.prefetch_prices, [ticker for ticker, _, _ in signals])
+        return await asyncio.gather(*(
+            asyncio.to_thread(self.execute_trade, ticker, action, size)
+            for ticker, action, size in signals
+        ))
+
     def execute_manual_trade(self, ticker: str, action: str, quantity: int) -> Dict:
         """Execute manual trade with specific quantity"""
         if not self.connected or not self.client:
@@ -247,7 +345,8 @@ class AlpacaTrader:
             )
             
             order = self.client.submit_order(order_data)
-            
+            self.invalidate_account()
+
             return {
                 "timestamp": datetime.now().isoformat(),
                 "symbol": ticker,
@@ -259,7 +358,7 @@ class AlpacaTrader:
             }
         
         except Exception as e:
-            logger.error(f"❌ Error executing manual trade: {e}")
+            logger.error("❌ Error executing manual trade: %s", e)
             raise
     
     def get_portfolio_value(self) -> float:
@@ -268,10 +367,10 @@ class AlpacaTrader:
             return 100000.0  # Mock value
         
         try:
-            account = self.client.get_account()
+            account = self._get_account_cached()
             return float(account.equity)
         except Exception as e:
-            logger.error(f"❌ Error getting portfolio value: {e}")
+            logger.error("❌ Error getting portfolio value: %s", e)
             return 0.0
     
     def _get_mock_portfolio(self) -> Dict:
@@ -301,47 +400,113 @@ class AlpacaTrader:
         }
 
 
+def load_scaler_params(path: str) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Load (mean, 1/scale) vectors from a scaler .npz file
+
+    Training saves StandardScaler parameters as plain float32 arrays so
+    inference can apply the transform inline without sklearn. The scale is
+    inverted once here because a multiply is cheaper than a divide per call.
+    """
+    try:
+        params = np.load(path)
+        mean = params['mean'].astype(np.float32)
+        inv_scale = (1.0 / params['scale']).astype(np.float32)
+        return mean, inv_scale
+    except Exception as e:
+        logger.error(f"❌ Error loading scaler parameters from {path}: {e}")
+        return None
+
+
+def fast_scaler_params(sk_scaler) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Extract (mean, 1/scale) vectors from a fitted sklearn StandardScaler
+
+    Legacy .pkl scalers carry sklearn's per-call input validation, which
+    costs far more than the subtract/multiply itself. Pulling mean_ and
+    scale_ out once at load time lets prepare_observation apply them with
+    the same in-place fast path used for .npz parameters.
+    """
+    try:
+        mean = np.asarray(sk_scaler.mean_, dtype=np.float32)
+        inv_scale = (1.0 / np.asarray(sk_scaler.scale_)).astype(np.float32)
+        return mean, inv_scale
+    except Exception as e:
+        logger.error(f"❌ Error extracting scaler parameters: {e}")
+        return None
+
+
+# Observation layout: feature keys in model order with their fallbacks
+_FEATURE_DEFAULTS = (
+    ('close', 0), ('open', 0), ('high', 0), ('low', 0), ('volume', 0),
+    ('sma_20', 0), ('sma_50', 0), ('ema_12', 0), ('ema_26', 0),
+    ('rsi', 50), ('macd', 0), ('macd_signal', 0), ('macd_hist', 0),
+    ('bb_upper', 0), ('bb_middle', 0), ('bb_lower', 0), ('returns', 0),
+)
+
+
+def prepare_observation_fast(row: np.ndarray, scaler=None,
+                             out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    Prepare an observation from an already-ordered feature row
+
+    Fast path for callers that hold the 17 features as a float32 array in
+    _FEATURE_DEFAULTS order: the dict lookups of prepare_observation
+    collapse into one copy. Pass a reusable (1, 17) `out` buffer to make
+    the call allocation-free.
+    """
+    if out is None:
+        out = np.empty((1, len(_FEATURE_DEFAULTS)), dtype=np.float32)
+    np.copyto(out[0], row)
+
+    if isinstance(scaler, tuple):
+        mean, inv_scale = scaler
+        out[0] -= mean
+        out[0] *= inv_scale
+    elif scaler is not None:
+        try:
+            out = scaler.transform(out)
+        except Exception as e:
+            logger.error("❌ Error scaling observation: %s", e)
+            return np.zeros((1, len(_FEATURE_DEFAULTS)), dtype=np.float32)
+
+    return out
+
+
 def prepare_observation(data: Dict, scaler=None) -> np.ndarray:
     """
     Prepare observation vector for RL model
-    
+
     Features expected by model:
     - Close, Open, High, Low, Volume
     - SMA_20, SMA_50, EMA_12, EMA_26
     - RSI, MACD, MACD_signal, MACD_hist
     - BB_upper, BB_middle, BB_lower
     - Returns
+
+    Writes straight into the float32 output array (no intermediate list of
+    boxed floats) and applies the scaler in place, so each call allocates
+    exactly one 17-element buffer.  The packing loop cannot raise (dict.get
+    with a numeric default), so only the legacy sklearn transform is
+    guarded; callers batching observations already isolate failures per
+    ticker.
     """
-    try:
-        # Extract features in correct order
-        features = [
-            data.get('close', 0),
-            data.get('open', 0),
-            data.get('high', 0),
-            data.get('low', 0),
-            data.get('volume', 0),
-            data.get('sma_20', 0),
-            data.get('sma_50', 0),
-            data.get('ema_12', 0),
-            data.get('ema_26', 0),
-            data.get('rsi', 50),
-            data.get('macd', 0),
-            data.get('macd_signal', 0),
-            data.get('macd_hist', 0),
-            data.get('bb_upper', 0),
-            data.get('bb_middle', 0),
-            data.get('bb_lower', 0),
-            data.get('returns', 0)
-        ]
-        
-        obs = np.array(features, dtype=np.float32).reshape(1, -1)
-        
-        # Normalize if scaler available
-        if scaler is not None:
+    obs = np.empty((1, len(_FEATURE_DEFAULTS)), dtype=np.float32)
+    row = obs[0]
+    for i, (key, default) in enumerate(_FEATURE_DEFAULTS):
+        row[i] = data.get(key, default)
+
+    # Normalize if scaler available: either (mean, 1/scale) arrays from
+    # load_scaler_params, or a fitted sklearn scaler for legacy .pkl files
+    if isinstance(scaler, tuple):
+        mean, inv_scale = scaler
+        row -= mean
+        row *= inv_scale
+    elif scaler is not None:
+        try:
             obs = scaler.transform(obs)
-        
-        return obs
-        
-    except Exception as e:
-        logger.error(f"❌ Error preparing observation: {e}")
-        return np.zeros((1, 17), dtype=np.float32)
\ No newline at end of file
+        except Exception as e:
+            logger.error("❌ Error scaling observation: %s", e)
+            return np.zeros((1, len(_FEATURE_DEFAULTS)), dtype=np.float32)
+
+    return obs
\ No newline at end of file
@@ -3,17 +3,100 @@ AI Portfolio Manager - Automated Setup Script
 Sets up project structure, downloads models, configures environment
 """
 
+import atexit
+import json
+import logging
+import logging.handlers
 import os
-import sys
+import queue
+import shutil
 import subprocess
+import sys
 from pathlib import Path
 
+# Opt in to the hf_transfer Rust downloader (multi-range chunked
+# connections per file); must be set before the hub import reads it
+os.environ.setdefault("HF_HUB_ENABLE_HF_TRANSFER", "1")
+
+# Optional imports resolved once at module load: functions branch on the
+# flags instead of re-running import machinery per call
+try:
+    from huggingface_hub import snapshot_download, try_to_load_from_cache
+    _HAS_HF = True
+except ImportError:
+    _HAS_HF = False
+
+try:
+    from dotenv import load_dotenv
+    _HAS_DOTENV = True
+except ImportError:
+    _HAS_DOTENV = False
+
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+
+def _dump_json(obj) -> bytes:
+    """Pretty-printed JSON bytes, serialised in C via orjson when available"""
+    if _HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    return json.dumps(obj, indent=2).encode()
+
+
+# File-copy buffer: Python's 8 KiB default is far below what modern SSDs
+# want, so buffered paths use 128 KiB chunks
+_WBUF = 128 * 1024
+
+
+def _fast_copy(src, dst):
+    """Copy a file in-kernel via copy_file_range, without the userspace
+    read/write round-trip of shutil.copy"""
+    with open(src, 'rb', buffering=_WBUF) as s, \
+            open(dst, 'wb', buffering=_WBUF) as d:
+        try:
+            remaining = os.fstat(s.fileno()).st_size
+            while remaining > 0:
+                copied = os.copy_file_range(s.fileno(), d.fileno(), remaining)
+                if copied == 0:
+                    break
+                remaining -= copied
+            if remaining == 0:
+                return
+        except (AttributeError, OSError):
+            pass
+        # Unsupported platform/filesystem: buffered copy in _WBUF chunks
+        s.seek(0)
+        d.seek(0)
+        d.truncate()
+        shutil.copyfileobj(s, d, length=_WBUF)
+
+
+# Separator built once; headers become a single write instead of three
+# print calls re-multiplying the same string
+_HDR_SEP = "\n" + "=" * 60 + "\n"
+
+# Producer/consumer logging: worker threads enqueue records cheaply and a
+# single listener thread drains them to stdout, so concurrent setup
+# phases never contend on the stdout lock and records stay whole
+_log_queue = queue.SimpleQueue()
+_log = logging.getLogger("setup")
+_log.setLevel(logging.INFO)
+_log.propagate = False
+
+if not _log.handlers:
+    _log.addHandler(logging.handlers.QueueHandler(_log_queue))
+    _listener = logging.handlers.QueueListener(
+        _log_queue, logging.StreamHandler(sys.stdout))
+    _listener.start()
+    atexit.register(_listener.stop)
+
 
 def print_header(text):
     """Print formatted header"""
-    print("\n" + "=" * 60)
-    print(f"  {text}")
-    print("=" * 60 + "\n")
+    _log.info(f"{_HDR_SEP}  {text}{_HDR_SEP}")
 
 
 def create_directory_structure():
@@ -29,11 +112,15 @@ def create_directory_structure():
         "config"
     ]
     
+    # Checking first is cheaper than an unconditional mkdir: warm reruns
+    # make one stat per leaf and no mkdir syscalls at all
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
-        print(f"✅ Created: {directory}/")
-    
-    print("\n✅ Directory structure created successfully!")
+        path = Path(directory)
+        if not path.is_dir():
+            path.mkdir(parents=True, exist_ok=True)
+            _log.info(f"✅ Created: {directory}/")
+
+    _log.info("\n✅ Directory structure created successfully!")
 
 
 def create_env_file():
@@ -71,104 +158,179 @@ LOG_FILE=logs/trading.log
     env_path = Path(".env")
     
     if env_path.exists():
-        print("⚠️  .env file already exists. Skipping...")
+        _log.info("⚠️  .env file already exists. Skipping...")
     else:
-        with open(env_path, 'w') as f:
-            f.write(env_content)
-        print("✅ Created .env file")
-        print("\n⚠️  IMPORTANT: Edit .env and add your Alpaca API keys!")
+        # One write syscall; skips the buffered-writer setup of open()
+        env_path.write_text(env_content)
+        _log.info("✅ Created .env file")
+        _log.info("\n⚠️  IMPORTANT: Edit .env and add your Alpaca API keys!")
+
+
+def _missing_requirements():
+    """Requirement lines from requirements.txt the current env doesn't meet
+
+    Returns None when the answer can't be determined (no packaging module,
+    unparseable line) so the caller falls through to pip.
+    """
+    try:
+        from importlib.metadata import version, PackageNotFoundError
+        from packaging.requirements import Requirement
+    except ImportError:
+        return None
+
+    missing = []
+    for line in Path("requirements.txt").read_text().splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            req = Requirement(line)
+        except Exception:
+            return None
+        if req.marker is not None and not req.marker.evaluate():
+            continue
+        try:
+            installed = version(req.name)
+        except PackageNotFoundError:
+            missing.append(line)
+            continue
+        if installed not in req.specifier:
+            missing.append(line)
+    return missing
 
 
 def install_python_dependencies():
     """Install Python dependencies"""
     print_header("📦 Installing Python Dependencies")
-    
+
+    # Warm rerun: checking installed versions takes milliseconds, while
+    # pip's resolver startup costs seconds even with nothing to do
+    if _missing_requirements() == []:
+        _log.info("✅ All dependencies already satisfied, skipping pip")
+        return
+
     try:
-        print("Installing packages from requirements.txt...")
+        _log.info("Installing packages from requirements.txt...")
+        # Prefer prebuilt wheels and defer bytecode compilation to first
+        # import; skipping pip's version self-check saves a network
+        # round-trip too. Trade-off: the very first backend start compiles
+        # .pyc lazily, but total setup wall time drops
         subprocess.run(
-            [sys.executable, "-m", "pip", "install", "-r", "requirements.txt"],
+            [
+                sys.executable, "-m", "pip", "install",
+                "--no-compile",
+                "--prefer-binary",
+                "--disable-pip-version-check",
+                "-r", "requirements.txt",
+            ],
+            env={**os.environ, "PIP_NO_INPUT": "1"},
             check=True
         )
-        print("\n✅ Python dependencies installed successfully!")
+        _log.info("\n✅ Python dependencies installed successfully!")
     
     except subprocess.CalledProcessError as e:
-        print(f"\n❌ Error installing dependencies: {e}")
-        print("Please install manually with: pip install -r requirements.txt")
+        _log.info(f"\n❌ Error installing dependencies: {e}")
+        _log.info("Please install manually with: pip install -r requirements.txt")
 
 
 def download_pretrained_models():
     """Download pretrained RL models from Hugging Face"""
     print_header("🧠 Downloading Pretrained Models")
     
+    if not _HAS_HF:
+        _log.info("\n⚠️  huggingface-hub not installed. Please install manually:")
+        _log.info("    pip install huggingface-hub")
+        _log.info("    Then run the download_models() function")
+        return
+
     try:
-        from huggingface_hub import hf_hub_download
-        
-        print("Downloading best_model.zip from Hugging Face...")
-        hf_hub_download(
-            repo_id="Adilbai/stock-trading-rl-agent",
-            filename="best_model.zip",
-            local_dir="backend/models/",
-            local_dir_use_symlinks=False
-        )
-        print("✅ Downloaded best_model.zip")
-        
-        print("\nDownloading scaler.pkl from Hugging Face...")
-        hf_hub_download(
-            repo_id="Adilbai/stock-trading-rl-agent",
-            filename="scaler.pkl",
-            local_dir="backend/models/",
-            local_dir_use_symlinks=False
-        )
-        print("✅ Downloaded scaler.pkl")
-        
-        # Create copies for sector-specific models
-        import shutil
-        
+        filenames = ["best_model.zip", "scaler.pkl"]
+
+        # Warm rerun: files already in the hub cache need no network at
+        # all, just a local copy into place
+        missing = []
+        for filename in filenames:
+            cached = try_to_load_from_cache(
+                repo_id="Adilbai/stock-trading-rl-agent",
+                filename=filename,
+            )
+            if isinstance(cached, str) and Path(cached).exists():
+                _fast_copy(cached, f"backend/models/{filename}")
+                _log.info(f"✅ Reused cached {filename}")
+            else:
+                missing.append(filename)
+
+        # One snapshot_download for the misses: the hub's own parallel
+        # fetcher reuses a single HTTP connection across files instead of
+        # paying a TLS handshake per file
+        def fetch_all():
+            _log.info(f"Downloading {len(missing)} files from Hugging Face...")
+            snapshot_download(
+                repo_id="Adilbai/stock-trading-rl-agent",
+                allow_patterns=missing,
+                local_dir="backend/models/",
+                max_workers=int(os.getenv("HF_PARALLEL_DOWNLOADING_WORKERS", "8")),
+            )
+            for filename in missing:
+                _log.info(f"✅ Downloaded {filename}")
+
+        if missing:
+            try:
+                fetch_all()
+            except (ImportError, ValueError) as e:
+                # The hub refuses to run with hf_transfer enabled but not
+                # installed; drop back to the default Python downloader
+                import huggingface_hub
+
+                _log.info(f"⚠️  hf_transfer unavailable ({e}); retrying with the default downloader...")
+                huggingface_hub.constants.HF_HUB_ENABLE_HF_TRANSFER = False
+                fetch_all()
+
+        # Hardlink the sector-specific models to the downloaded artifact:
+        # byte-identical read-only copies, so no data needs duplicating
         model_path = Path("backend/models/best_model.zip")
         if model_path.exists():
-            shutil.copy(model_path, "backend/models/tech_model.zip")
-            shutil.copy(model_path, "backend/models/energy_model.zip")
-            print("\n✅ Created sector-specific model copies")
+            for dest in ("backend/models/tech_model.zip",
+                         "backend/models/energy_model.zip"):
+                Path(dest).unlink(missing_ok=True)
+                try:
+                    os.link(model_path, dest)
+                except OSError:
+                    # Cross-filesystem or no hardlink support
+                    _fast_copy(model_path, dest)
+            _log.info("\n✅ Created sector-specific model copies")
         
-        print("\n✅ Models downloaded and configured successfully!")
-        
-    except ImportError:
-        print("\n⚠️  huggingface-hub not installed. Please install manually:")
-        print("    pip install huggingface-hub")
-        print("    Then run the download_models() function")
-    
+        _log.info("\n✅ Models downloaded and configured successfully!")
+
     except Exception as e:
-        print(f"\n❌ Error downloading models: {e}")
-        print("\nManual download instructions:")
-        print("1. Visit: https://huggingface.co/Adilbai/stock-trading-rl-agent")
-        print("2. Download best_model.zip and scaler.pkl")
-        print("3. Place in backend/models/ directory")
+        _log.info(f"\n❌ Error downloading models: {e}")
+        _log.info("\nManual download instructions:")
+        _log.info("1. Visit: https://huggingface.co/Adilbai/stock-trading-rl-agent")
+        _log.info("2. Download best_model.zip and scaler.pkl")
+        _log.info("3. Place in backend/models/ directory")
 
 
 def create_sample_data():
     """Create sample data files"""
     print_header("📊 Creating Sample Data Files")
     
-    # Create empty trades.csv
-    trades_path = Path("data/trades.csv")
-    if not trades_path.exists():
-        with open(trades_path, 'w') as f:
-            f.write("timestamp,symbol,action,qty,price,pnl,order_id,model\n")
-        print("✅ Created data/trades.csv")
+    # One directory listing instead of a stat per file
+    existing = {entry.name for entry in os.scandir("data")}
+
+    if "trades.csv" not in existing:
+        Path("data/trades.csv").write_text(
+            "timestamp,symbol,action,qty,price,pnl,order_id,model\n")
+        _log.info("✅ Created data/trades.csv")
+
+    if "performance.json" not in existing:
+        Path("data/performance.json").write_bytes(_dump_json({
+            "equity_history": [],
+            "daily_returns": [],
+            "last_updated": None
+        }))
+        _log.info("✅ Created data/performance.json")
     
-    # Create empty performance.json
-    import json
-    perf_path = Path("data/performance.json")
-    if not perf_path.exists():
-        with open(perf_path, 'w') as f:
-            json.dump({
-                "equity_history": [],
-                "daily_returns": [],
-                "last_updated": None
-            }, f, indent=2)
-        print("✅ Created data/performance.json")
-    
-    print("\n✅ Sample data files created!")
+    _log.info("\n✅ Sample data files created!")
 
 
 def setup_frontend():
@@ -205,48 +367,63 @@ def setup_frontend():
         }
     }
     
-    import json
-    with open(frontend_path / "package.json", 'w') as f:
-        json.dump(package_json, f, indent=2)
+    (frontend_path / "package.json").write_bytes(_dump_json(package_json))
     
-    print("✅ Created package.json")
-    print("\n📝 To complete frontend setup:")
-    print("   cd frontend")
-    print("   npm install")
-    print("   npm run dev")
+    _log.info("✅ Created package.json")
+    _log.info("\n📝 To complete frontend setup:")
+    _log.info("   cd frontend")
+    _log.info("   npm install")
+    _log.info("   npm run dev")
+
+
+# One-shot guard: dotenv parsing allocates a surprising amount of string
+# data, so repeated credential checks reuse the first load
+_ENV_LOADED = False
+
+# Values that mean "not actually configured": unset, empty, or the
+# placeholders shipped in the generated .env
+_PLACEHOLDER_CREDENTIALS = {
+    "",
+    "your_alpaca_api_key_here",
+    "your_alpaca_secret_key_here",
+}
 
 
 def check_alpaca_credentials():
     """Check if Alpaca credentials are configured"""
+    global _ENV_LOADED
+
     print_header("🔑 Checking Alpaca Configuration")
-    
-    try:
-        from dotenv import load_dotenv
+
+    if not _HAS_DOTENV:
+        _log.info("⚠️  python-dotenv not installed")
+        return
+
+    if not _ENV_LOADED:
         load_dotenv()
-        
-        api_key = os.getenv("APCA_API_KEY_ID")
-        api_secret = os.getenv("APCA_API_SECRET_KEY")
-        
-        if api_key and api_key != "your_alpaca_api_key_here":
-            print("✅ Alpaca API Key configured")
-        else:
-            print("⚠️  Alpaca API Key not configured")
-            print("   Get your keys at: https://alpaca.markets/")
-        
-        if api_secret and api_secret != "your_alpaca_secret_key_here":
-            print("✅ Alpaca Secret Key configured")
-        else:
-            print("⚠️  Alpaca Secret Key not configured")
-        
-    except ImportError:
-        print("⚠️  python-dotenv not installed")
+        _ENV_LOADED = True
+
+    env = os.environ
+    api_key = env.get("APCA_API_KEY_ID", "")
+    api_secret = env.get("APCA_API_SECRET_KEY", "")
+
+    if api_key not in _PLACEHOLDER_CREDENTIALS:
+        _log.info("✅ Alpaca API Key configured")
+    else:
+        _log.info("⚠️  Alpaca API Key not configured")
+        _log.info("   Get your keys at: https://alpaca.markets/")
+
+    if api_secret not in _PLACEHOLDER_CREDENTIALS:
+        _log.info("✅ Alpaca Secret Key configured")
+    else:
+        _log.info("⚠️  Alpaca Secret Key not configured")
 
 
 def print_next_steps():
     """Print next steps for user"""
     print_header("🎯 Next Steps")
     
-    print("""
+    _log.info("""
 1. ✏️  Edit .env file and add your Alpaca API keys:
    - Sign up at https://alpaca.markets/
    - Get Paper Trading API keys
@@ -294,35 +471,56 @@ def print_next_steps():
 
 def main():
     """Run complete setup"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="AI Portfolio Manager setup")
+    parser.add_argument(
+        "-y", "--yes",
+        action="store_true",
+        help="skip the confirmation prompt (for CI/non-interactive runs)"
+    )
+    args = parser.parse_args()
+
     print("\n" + "🤖" * 30)
     print("  AI Portfolio Manager - Automated Setup")
     print("🤖" * 30)
-    
+
     print("\nThis script will set up your AI Portfolio Manager project.")
     print("It will create directories, download models, and configure the environment.\n")
-    
-    response = input("Continue with setup? (y/n): ")
-    
+
+    response = 'y' if args.yes else input("Continue with setup? (y/n): ")
+
     if response.lower() != 'y':
-        print("\n❌ Setup cancelled.")
+        _log.info("\n❌ Setup cancelled.")
         return
     
     try:
-        # Run setup steps
+        # Run setup steps. The local file writes are independent of the
+        # pip install, so they overlap it on worker threads; the model
+        # download runs after pip since it may need huggingface_hub
         create_directory_structure()
-        create_env_file()
-        install_python_dependencies()
+
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            phases = [
+                pool.submit(install_python_dependencies),
+                pool.submit(create_env_file),
+                pool.submit(create_sample_data),
+                pool.submit(setup_frontend),
+            ]
+            for phase in phases:
+                phase.result()
+
         download_pretrained_models()
-        create_sample_data()
-        setup_frontend()
         check_alpaca_credentials()
         
         print_header("✅ Setup Complete!")
         print_next_steps()
         
     except Exception as e:
-        print(f"\n❌ Setup failed with error: {e}")
-        print("Please check the error and try again.")
+        _log.info(f"\n❌ Setup failed with error: {e}")
+        _log.info("Please check the error and try again.")
         return 1
     
     return 0